@@ -0,0 +1,113 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from keyword_automaton import PatternAutomaton
+from lru_memo import LRUMemo
+
+ALIASES_PATH = Path(__file__).parent / "data" / "aliases.json"
+ALIAS_KINDS = ("program", "department", "college", "course")
+
+
+class AliasHit(NamedTuple):
+    kind: str
+    target: str
+    alias: str
+    start: int
+    end: int
+
+
+def alias_key(text: str) -> str:
+    return " ".join((text or "").split()).upper()
+
+
+class AliasRegistry:
+    """Every program, department, college and course alias in one table.
+
+    The aliases of all kinds are compiled into a single automaton, so find()
+    reports the typed hits of a message in one scan. Within each kind, hits
+    are whole words, leftmost first and longest at each position, and do not
+    overlap; different kinds may cover the same span ("CAS" is both a college
+    and a department).
+    """
+
+    def __init__(self, entries: Dict[str, Dict[str, List[str]]]):
+        self._aliases: Dict[str, List[str]] = {kind: [] for kind in ALIAS_KINDS}
+        self._tables: Dict[str, Dict[str, str]] = {kind: {} for kind in ALIAS_KINDS}
+        payloads: Dict[str, List[Tuple[str, str]]] = {}
+        for kind, targets in entries.items():
+            aliases = self._aliases.setdefault(kind, [])
+            table = self._tables.setdefault(kind, {})
+            for target, names in targets.items():
+                for name in names:
+                    key = alias_key(name)
+                    if not key or key in table:
+                        continue
+                    aliases.append(name)
+                    table[key] = target
+                    payloads.setdefault(key, []).append((kind, target))
+        self._keys = list(payloads)
+        self._payloads = [payloads[k] for k in self._keys]
+        self._automaton = PatternAutomaton(self._keys)
+        self._memo = LRUMemo(1024)
+
+    @classmethod
+    def from_file(cls, path: Path = ALIASES_PATH) -> "AliasRegistry":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def aliases(self, kind: str) -> List[str]:
+        """The aliases of one kind, in file order and original spelling."""
+        return list(self._aliases.get(kind, ()))
+
+    def table(self, kind: str) -> Dict[str, str]:
+        """alias_key(alias) -> target for one kind."""
+        return dict(self._tables.get(kind, {}))
+
+    def resolve(self, kind: str, text: str) -> Optional[str]:
+        """The target whose alias is exactly `text`, ignoring case and spacing."""
+        return self._tables.get(kind, {}).get(alias_key(text))
+
+    def find(self, text: str) -> Tuple[AliasHit, ...]:
+        return self._memo.get(text or "", lambda: self._find(text or ""))
+
+    def first(self, text: str, kind: str) -> Optional[AliasHit]:
+        return next((h for h in self.find(text) if h.kind == kind), None)
+
+    def _chars(self, text: str) -> Iterator[Tuple[int, str]]:
+        # Upper-case and collapse whitespace runs to one space, keeping the
+        # position of each character in the original text.
+        prev_space = True
+        for pos, ch in enumerate(text):
+            if ch.isspace():
+                if not prev_space:
+                    yield pos, " "
+                prev_space = True
+                continue
+            prev_space = False
+            for up in ch.upper():
+                yield pos, up
+
+    def _find(self, text: str) -> Tuple[AliasHit, ...]:
+        best: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        for start, end, i in self._automaton.matches(self._chars(text)):
+            if start > 0 and text[start - 1].isalnum() or end < len(text) and text[end].isalnum():
+                continue
+            for kind, _ in self._payloads[i]:
+                prev = best.get((kind, start))
+                if prev is None or end > prev[0]:
+                    best[(kind, start)] = (end, i)
+
+        hits: List[AliasHit] = []
+        covered: Dict[str, int] = {}
+        for (kind, start), (end, i) in sorted(best.items(), key=lambda kv: kv[0][1]):
+            if start < covered.get(kind, 0):
+                continue
+            covered[kind] = end
+            target = next(t for k, t in self._payloads[i] if k == kind)
+            hits.append(AliasHit(kind, target, text[start:end], start, end))
+        return tuple(hits)
+
+
+ALIASES = AliasRegistry.from_file()
+
@@ -1,39 +1,14 @@
+import os
 import re
+import threading
+from collections import Counter
 from pathlib import Path
 from typing import Optional, Tuple
 
 import streamlit as st
-from rapidfuzz import fuzz
 
 from chat_ui import getchatbubblehtml, getfooterhtml
 
-from data_api import (
-    load_all,
-    find_course_by_code,
-    fuzzy_best_program,
-    fuzzy_best_course_title,
-    fuzzy_top_course_titles,
-    get_prerequisites,
-    course_by_alias,
-    find_course_any,
-    courses_for_plan,
-    units_by_program_year,
-    units_by_program_year_with_exclusions,
-    list_department_heads,
-    get_department_head_by_name,
-    department_lookup,
-    get_dept_role_label,
-    get_cas_dean,
-    get_program_head,
-    _clean_course_query,
-    get_course_curriculum_entries
-)
-from nlu_rules import (
-    build_gazetteers,
-    detect_intent,
-    extract_entities,
-)
-
 
 def load_css_rel_path(css_path: Path):
     relpath = (Path(__file__).parent / css_path).resolve()
@@ -56,14 +31,77 @@ SUPPORTED_PROGRAMS = [
 ]
 
 
-@st.cache_data(show_spinner=False)
-def bootstrap_data():
-    data = load_all()
-    build_gazetteers(data["programs"], data["courses"], data["departments"])
-    return data
+# "deferred" sends the page chrome first and loads the catalog and NLU on a
+# background thread; "eager" loads everything before rendering anything.
+STARTUP_MODE = os.environ.get("CASMATE_STARTUP", "deferred")
+
+
+class Bootstrap:
+    """Loads the catalog and NLU engine once per process on a worker thread."""
+
+    def __init__(self):
+        self.data = None
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+        threading.Thread(target=self._run, name="casmate-bootstrap", daemon=True).start()
+
+    def _run(self):
+        try:
+            # The catalog modules pull in numpy, rapidfuzz and SQLite; import
+            # them here so the page chrome does not wait for them.
+            from data_api import DEFAULT_COLLEGE, catalog_files, load_all
+            from nlu_rules import load_or_build_gazetteers
+
+            data = load_all()
+            engine = load_or_build_gazetteers(data, catalog_files())
+            shard_router().adopt(DEFAULT_COLLEGE, data, engine)
+            self.data = data
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def result(self) -> dict:
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.data
 
 
-data = bootstrap_data()
+@st.cache_resource(show_spinner=False)
+def bootstrap() -> Bootstrap:
+    return Bootstrap()
+
+
+@st.cache_resource(show_spinner=False)
+def shard_router():
+    """Catalogs of the other colleges, loaded when a message first names one."""
+    from college_shards import ShardRouter
+
+    return ShardRouter()
+
+
+def await_bootstrap() -> dict:
+    boot = bootstrap()
+    if not boot.ready:
+        with st.spinner("CASmate is warming up…"):
+            boot.wait()
+    if boot.error is not None:
+        # Like st.cache_data, don't keep a failed load around.
+        bootstrap.clear()
+    return boot.result()
+
+
+bootstrap()
+if STARTUP_MODE == "eager":
+    data = await_bootstrap()
 
 if "user_name" not in st.session_state:
     st.session_state.user_name = None
@@ -179,24 +217,48 @@ if not st.session_state.did_intro_prompt:
 for msg in st.session_state.chat:
     render_message(msg["sender"], msg["message"], source=msg.get("source"))
 
+data = await_bootstrap()
+
+# Already loaded by the bootstrap thread.
+from rapidfuzz import fuzz
+
+from alias_registry import ALIASES
+
+from data_api import (
+    DEFAULT_COLLEGE,
+    find_course_by_code,
+    fuzzy_best_program,
+    fuzzy_best_course_title,
+    fuzzy_top_course_titles,
+    get_prerequisites,
+    course_by_alias,
+    find_course_any,
+    courses_for_plan,
+    plan_years,
+    courses_with_flag,
+    course_flags,
+    units_by_program_year,
+    units_by_program_year_with_exclusions,
+    contact_minutes_for_term,
+    list_department_heads,
+    get_department_head_by_name,
+    department_lookup,
+    get_dept_role_label,
+    get_cas_dean,
+    get_program_head,
+    _clean_course_query,
+    get_course_curriculum_entries
+)
+from nlu_rules import get_engine
+
 CODE_RE = re.compile(r"\b([A-Za-z]{2,4})[\s-]?(\d{2,})\b")
 GREETINGS = {
     "hi", "hello", "hey", "hiya", "yo", "howdy", "good morning", "good afternoon", "good evening",
     "greetings", "sup", "morning", "afternoon", "evening"
 }
 NON_NAMES = {"thanks", "thank you", "ok", "okay", "pls", "please", "yes", "no"}
-
-COLLEGE_ALIASES = {
-    "CAS": ["CAS", "COLLEGE OF ARTS AND SCIENCES", "COLLEGE OF ARTS & SCIENCES"],
-    "CCJE": ["CCJE", "COLLEGE OF CRIMINAL JUSTICE EDUCATION"],
-    "COL": ["COL", "COLLEGE OF LAW"],
-    "COBE": ["COBE", "COLLEGE OF BUSINESS EDUCATION"],
-    "COME": ["COME", "COLLEGE OF MARITIME EDUCATION"],
-    "CTE": ["CTE", "COLLEGE OF TEACHER EDUCATION"],
-    "CAHS": ["CAHS", "COLLEGE OF ALLIED HEALTH SCIENCES"],
-    "CIHTM": ["CIHTM", "COLLEGE OF INTERNATIONAL HOSPITALITY AND TOURISM MANAGEMENT"],
-    "CEAT": ["CEAT", "COLLEGE OF ENGINEERING", "COLLEGE OF ENGINEERING, ARCHITECTURE, AND TECHNOLOGY", "COLLEGE OF ENGINEERING ARCHITECTURE AND TECHNOLOGY"],
-}
+ACKNOWLEDGEMENTS = {"yes", "yeah", "yup", "ok", "okay", "sure", "thanks", "thank you"}
+PAYMENT_KEYWORDS = ["tuition", "payment", "pay", "downpayment", "down payment", "cashier", "finance", "fees", "balance"]
 
 NWU_OFFICIAL_URL = "https://www.facebook.com/NWUofficial"
 NWU_FINANCE_URL = "https://www.facebook.com/NWUFinance"
@@ -207,8 +269,7 @@ def format_course(c: dict) -> str:
 
 
 def _is_diagnostic_review_course(course: dict) -> bool:
-    code = (course.get("course_code") or course.get("course_id") or "").strip().upper()
-    return code in {"IENG", "IMAT"}
+    return "diagnostic" in course_flags(course)
 
 
 def _format_head_row(r: dict) -> str:
@@ -235,50 +296,29 @@ def _friendly_year(y: int) -> str:
 
 def _friendly_term(t: int) -> str:
     return {1: "First Trimester", 2: "Second Trimester", 3: "Third Trimester"}.get(int(t), f"Term {t}")
-def _is_lab_course(c: dict) -> bool:
-    code = (c.get("course_code") or "").upper()
-    if "L/L" in code:
-        return True
-    
-    lab_hours = str(c.get("laboratory_hours_per_week") or "").strip()
-    if lab_hours and lab_hours != "0":
-        return True
-        
-    return False
-
-
 def _format_lab_code(code: str) -> str:
     return code.replace("L/L", "").strip()
 
+def _format_minutes(minutes: int) -> str:
+    hours, rest = divmod(minutes, 60)
+    parts = [f"{hours} hour" + ("s" if hours != 1 else "")] if hours else []
+    if rest or not hours:
+        parts.append(f"{rest} minutes")
+    return " ".join(parts)
+
 def _format_units_display(c: dict) -> Tuple[str, int]:
     raw = str(c.get("credit_units") or "0").strip()
-    total = 0
-    display = ""
-    
+    total = c.get("total_units") or 0
+    if not total:
+        return f"{raw} units", 0
+    if raw.count("/") == 1:
+        return f"{total} units ({c.get('lecture_units', 0)} lec / {c.get('lab_units', 0)} lab)", total
     if "/" in raw:
-        try:
-            parts = [int(p) for p in raw.split("/")]
-            total = sum(parts)
-            if len(parts) == 2:
-                display = f"{total} units ({parts[0]} lec / {parts[1]} lab)"
-            else:
-                display = f"{total} units ({raw})"
-        except:
-            total = 0
-            display = f"{raw} units"
-    else:
-        try:
-            total = int(float(raw))
-            unit_str = "unit" if total == 1 else "units"
-            display = f"{total} {unit_str}"
-        except:
-            total = 0
-            display = f"{raw} units"
-            
-    return display, total
+        return f"{total} units ({raw})", total
+    return (f"{total} unit" if total == 1 else f"{total} units"), total
 
 
-def handle_lab_subjects(user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
+def handle_lab_subjects(data: dict, user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
     programs = data["programs"]
     plan = data["plan"]
     courses = data["courses"]
@@ -307,8 +347,7 @@ def handle_lab_subjects(user_text: str, ents: dict) -> Tuple[str, Optional[str]]
     target_term = ents.get("term_num")
 
     def get_labs_for_slice(y, t):
-        term_courses = courses_for_plan(plan, courses, pid, y, t)
-        return [c for c in term_courses if _is_lab_course(c)]
+        return courses_for_plan(plan, courses, pid, y, t, flag="lab")
 
     if target_year:
         if target_year > 3:
@@ -400,7 +439,7 @@ def handle_lab_subjects(user_text: str, ents: dict) -> Tuple[str, Optional[str]]
     return ("\n".join(lines), OFFICIAL_SOURCE)
 
 
-def handle_when_taken(user_text: str, ents: dict, course_obj: Optional[dict] = None) -> Tuple[str, Optional[str]]:
+def handle_when_taken(data: dict, user_text: str, ents: dict, course_obj: Optional[dict] = None) -> Tuple[str, Optional[str]]:
     plan = data["plan"]
     courses = data["courses"]
     programs = data["programs"]
@@ -490,7 +529,7 @@ def _looks_like_greeting(text: str) -> bool:
     return t in GREETINGS
 
 
-def handle_max_units(user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
+def handle_max_units(data: dict, user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
     programs = data["programs"]
     departments = data["departments"]
     tlow = (user_text or "").lower()
@@ -587,18 +626,14 @@ def _looks_like_question(text: str) -> bool:
     return False
 
 
-def _looks_like_payment(text: str) -> bool:
-    t = (text or "").lower()
-    return any(k in t for k in ["tuition", "payment", "pay", "downpayment", "down payment", "cashier", "finance", "fees", "balance"])
+def _detect_college(text: str) -> Optional[str]:
+    hit = ALIASES.first(text, "college")
+    return hit.target if hit else None
 
 
-def _detect_college(text: str) -> Optional[str]:
-    t = (text or "").upper()
-    for code, aliases in COLLEGE_ALIASES.items():
-        for a in aliases:
-            if a and a.upper() in t:
-                return code
-    return None
+def _refers_away(college: Optional[str]) -> bool:
+    """A college other than ours whose catalog we do not have."""
+    return bool(college) and college != DEFAULT_COLLEGE and not shard_router().has(college)
 
 
 def _refer_university(channel_hint: Optional[str] = None) -> str:
@@ -674,7 +709,7 @@ def _is_generic_nstp_query(user_text: str) -> bool:
     return len(others) == 0
 
 
-def _build_nstp_overview() -> str:
+def _build_nstp_overview(data: dict) -> str:
     courses = data["courses"]
     prereqs = data["prereqs"]
     nstp1 = find_course_by_code(courses, "NSTP 1")
@@ -725,14 +760,10 @@ def _is_generic_thesis_query(user_text: str) -> bool:
     return len(others) == 0
 
 
-def _build_pathfit_overview() -> str:
+def _build_pathfit_overview(data: dict) -> str:
     courses = data["courses"]
     prereqs = data["prereqs"]
-    pathfit_courses = []
-    for c in courses:
-        code = (c.get("course_code") or c.get("course_id") or "").strip().upper()
-        if code.startswith("PATHFIT"):
-            pathfit_courses.append(c)
+    pathfit_courses = courses_with_flag(courses, "pathfit")
 
     if not pathfit_courses:
         return "I couldn't find any PATHFIT courses listed right now."
@@ -761,20 +792,16 @@ def _build_pathfit_overview() -> str:
     return "\n".join(lines)
 
 
-def _build_thesis_overview() -> str:
+def _build_thesis_overview(data: dict) -> str:
     courses = data["courses"]
     prereqs = data["prereqs"]
     programs = data["programs"]
     plan = data["plan"]
 
     thesis_courses_by_code: dict[str, dict] = {}
-    for c in courses:
-        title = (c.get("course_title") or "").strip().lower()
+    for c in courses_with_flag(courses, "thesis"):
         code = (c.get("course_code") or c.get("course_id") or "").strip().upper()
-        if not code:
-            continue
-        if "thesis" in title or "thesis/special project" in title or "research in psychology" in title:
-            thesis_courses_by_code[code] = c
+        thesis_courses_by_code[code] = c
 
     if not thesis_courses_by_code:
         return "I couldn't find any thesis or research courses listed in the data right now."
@@ -856,16 +883,16 @@ def _build_thesis_overview() -> str:
     return "\n".join(lines)
 
 
-def handle_prereq(user_text: str, ents: dict, course_obj: Optional[dict] = None) -> Tuple[str, Optional[str]]:
+def handle_prereq(data: dict, user_text: str, ents: dict, course_obj: Optional[dict] = None) -> Tuple[str, Optional[str]]:
     courses = data["courses"]
     prereqs = data["prereqs"]
 
     if _is_generic_thesis_query(user_text):
-        return (_build_thesis_overview(), OFFICIAL_SOURCE)
+        return (_build_thesis_overview(data), OFFICIAL_SOURCE)
     if _is_generic_nstp_query(user_text):
-        return (_build_nstp_overview(), OFFICIAL_SOURCE)
+        return (_build_nstp_overview(data), OFFICIAL_SOURCE)
     if _is_generic_pathfit_query(user_text):
-        return (_build_pathfit_overview(), OFFICIAL_SOURCE)
+        return (_build_pathfit_overview(data), OFFICIAL_SOURCE)
 
     course = course_obj
     if not course:
@@ -960,7 +987,7 @@ def _format_units(u_val) -> str:
         return f"{u_val} units"
 
 
-def handle_units(user_text: str, ents: dict, course_obj: Optional[dict] = None) -> Tuple[str, Optional[str]]:
+def handle_units(data: dict, user_text: str, ents: dict, course_obj: Optional[dict] = None) -> Tuple[str, Optional[str]]:
     programs = data["programs"]
     plan = data["plan"]
     courses = data["courses"]
@@ -1030,16 +1057,7 @@ def handle_units(user_text: str, ents: dict, course_obj: Optional[dict] = None)
 
         year = ents.get("year_num")
         if not year:
-            year_values: list[int] = []
-            for entry in plan:
-                if entry.get("program_id") != pid: continue
-                yl = entry.get("year_level")
-                try:
-                    y_int = int(str(yl))
-                except Exception: continue
-                if y_int not in year_values: year_values.append(y_int)
-            
-            year_values = sorted(year_values)
+            year_values = plan_years(plan, courses, pid)
             if not year_values:
                 return (f"I couldn't find unit data for {pname} in the curriculum plan.", None)
 
@@ -1102,6 +1120,12 @@ def handle_units(user_text: str, ents: dict, course_obj: Optional[dict] = None)
             header = f"Units for {year_label} {pname}, {sem_label}" + (" (excluding diagnostic review subjects):" if has_diag else ":")
             lines.append(header)
             lines.append(f"• {sem_label}: {units_for_term} units")
+            contact = contact_minutes_for_term(plan, courses, pid, year, term, exclude_diagnostic=True)
+            if contact["total_minutes"]:
+                lines.append(
+                    f"• Weekly contact time: {_format_minutes(contact['total_minutes'])} "
+                    f"({_format_minutes(contact['lecture_minutes'])} lecture, {_format_minutes(contact['lab_minutes'])} lab)"
+                )
             if has_diag:
                 lines.append("Note: Diagnostic review subjects like IMAT (Math Review) and IENG (English Review) are not included. You can check with the Guidance Office via their Facebook page https://www.facebook.com/NWUGuidance.")
             
@@ -1136,7 +1160,7 @@ def handle_units(user_text: str, ents: dict, course_obj: Optional[dict] = None)
         None
     )
 
-def handle_curriculum(user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
+def handle_curriculum(data: dict, user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
     programs = data["programs"]
     plan = data["plan"]
     courses = data["courses"]
@@ -1247,7 +1271,7 @@ def handle_curriculum(user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
     year_labels = {1: "First year", 2: "Second year", 3: "Third year", 4: "Fourth year"}
     year_label = year_labels.get(year, f"Year {year}")
     
-    year_exists = any((entry.get("program_id") == pid and int(entry.get("year_level", 0)) == year) for entry in plan)
+    year_exists = year in plan_years(plan, courses, pid)
     if not year_exists:
          return (f"I couldn’t find any curriculum entries for {year_label} (Year {year}) in {pname}. The current data might only cover up to Year 3.", None)
 
@@ -1289,12 +1313,12 @@ def handle_curriculum(user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
     lines.append(f"")
     return ("\n".join(lines), OFFICIAL_SOURCE)
 
-def handle_dept_heads_list_or_clarify(user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
+def handle_dept_heads_list_or_clarify(data: dict, user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
     tlow = (user_text or "").lower().strip()
     college = _detect_college(user_text)
-    if college and college != "CAS":
+    if _refers_away(college):
         return (_refer_university(), None)
-    if "all" in tlow or "cas" in tlow or "entire" in tlow or "everyone" in tlow or college == "CAS":
+    if "all" in tlow or "cas" in tlow or "entire" in tlow or "everyone" in tlow or college:
         rows = list_department_heads(data["departments"])
         if not rows: return ("No department heads found.", None)
         lines = ["Department heads (including Dean):"]
@@ -1307,20 +1331,20 @@ def handle_dept_heads_list_or_clarify(user_text: str, ents: dict) -> Tuple[str,
     return ("Do you mean CAS department heads, or heads from another college?", None)
 
 
-def handle_dept_head_one(user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
+def handle_dept_head_one(data: dict, user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
     tlow = (user_text or "").lower()
     college = _detect_college(user_text)
     if "dean" in tlow:
-        if college == "CAS" or (college is None):
+        if not _refers_away(college):
             dean_row = get_cas_dean(data["departments"])
             if dean_row and dean_row.get("department_head"):
                 return (
-                    f"The current CAS Dean is {dean_row.get('department_head')}.\n\n"
+                    f"The current {college or DEFAULT_COLLEGE} Dean is {dean_row.get('department_head')}.\n\n"
                     "For information about other colleges, please check with their respective offices. ",
                     None
                 )
             return ("No dean is recorded.", None)
-        if college and college != "CAS":
+        if _refers_away(college):
             return (_refer_university(), None)
         
         st.session_state.awaiting_college_scope = True
@@ -1342,7 +1366,7 @@ def handle_dept_head_one(user_text: str, ents: dict) -> Tuple[str, Optional[str]
     return (f"The {role.lower()} is {head}. ", None)
 
 
-def resolve_pending(user_text: str) -> Optional[Tuple[str, Optional[str]]]:
+def resolve_pending(data: dict, user_text: str) -> Optional[Tuple[str, Optional[str]]]:
     tlow = (user_text or "").lower().strip()
     if st.session_state.pending_intent == "dept_heads_list":
         st.session_state.awaiting_dept_scope = False
@@ -1366,7 +1390,7 @@ def resolve_pending(user_text: str) -> Optional[Tuple[str, Optional[str]]]:
         intent = st.session_state.pending_intent
         st.session_state.pending_intent = None
         college = _detect_college(user_text)
-        if college == "CAS":
+        if college and not _refers_away(college):
             if intent == "ask_dean_college":
                 dean_row = get_cas_dean(data["departments"])
                 if dean_row and dean_row.get("department_head"):
@@ -1380,12 +1404,12 @@ def resolve_pending(user_text: str) -> Optional[Tuple[str, Optional[str]]]:
                     lines.append(f"- {_format_head_row(r)}")
                 lines.append("")
                 return ("\n".join(lines), None)
-        if college and college != "CAS":
+        if college:
             return (_refer_university(), None)
         return ("Thanks. Please specify a college.", None)
     return None
 
-def handle_major_minor_inquiry(user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
+def handle_major_minor_inquiry(data: dict, user_text: str, ents: dict) -> Tuple[str, Optional[str]]:
     programs = data["programs"]
     departments = data["departments"]
     tlow = (user_text or "").lower()
@@ -1434,23 +1458,96 @@ def handle_major_minor_inquiry(user_text: str, ents: dict) -> Tuple[str, Optiona
     )
 
 
+GREETING_REPLY = "Hey there! How can I help you today?"
+ACK_REPLY = "Got it. If you have a specific question about a course or program, feel free to ask!"
+
+_PAYMENT_ALT = "|".join(re.escape(k) for k in PAYMENT_KEYWORDS)
+_FAST_PATH_RE = re.compile(
+    rf"(?P<payment>{_PAYMENT_ALT})"
+    rf"|^(?!.*(?:{_PAYMENT_ALT}))\s*(?:"
+    r"(?P<code>(?![a-z]?lab)[a-z]{2,4}[\s-]?\d{2,})"
+    r"|(?P<greeting>" + "|".join(re.escape(g) for g in sorted(GREETINGS, key=len, reverse=True)) + ")"
+    r"|(?P<ack>" + "|".join(re.escape(a) for a in sorted(ACKNOWLEDGEMENTS, key=len, reverse=True)) + ")"
+    r")[\s?!.,]*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+@st.cache_resource
+def fast_path_stats() -> Counter:
+    """Per-process counters of which path route() took: the regex fast path kinds or "spacy"."""
+    return Counter()
+
+
+def _found_course_reply(c: dict) -> Tuple[str, Optional[str]]:
+    return (
+        f"I found **{format_course(c)}**.\n\n"
+        "What do you need? I can check its **units**, **prerequisites**, "
+        "or verify if it's in your curriculum. ",
+        None
+    )
+
+
+def _possible_match_reply(c: dict) -> Tuple[str, Optional[str]]:
+    return (
+        f"I found a possible match: **{format_course(c)}**.\n\n"
+        "Is this the course you're looking for? "
+        "If yes, I can provide its **units** or **prerequisites**.",
+        None
+    )
+
+
+def _pre_classify(text: str) -> Optional[str]:
+    m = _FAST_PATH_RE.search(text or "")
+    return m.lastgroup if m else None
+
+
+def _fast_path(data: dict, user_text: str, kind: str) -> Optional[Tuple[str, Optional[str]]]:
+    if kind == "payment":
+        return (_refer_university(channel_hint="finance"), None)
+    if kind == "greeting":
+        return (GREETING_REPLY, None)
+    if kind == "ack":
+        return (ACK_REPLY, None)
+    if kind == "code":
+        c, match_type = find_course_any(data, user_text)
+        if c and match_type in ("code", "exact_title", "exact_title_subset", "alias", "high_confidence_fuzzy"):
+            return _found_course_reply(c)
+        if c and match_type == "fuzzy_code":
+            return _possible_match_reply(c)
+    return None
+
+
 def route(user_text: str) -> Tuple[str, Optional[str]]:
+    router = shard_router()
+    college = router.college_for(user_text)
+    shard = router.get(college) if college and college != DEFAULT_COLLEGE else None
+    if shard is None:
+        return _route(data, user_text, get_engine())
+    # Answer from the other college's catalog for this message only.
+    return _route(shard.data, user_text, shard.engine)
+
+
+def _route(data: dict, user_text: str, engine) -> Tuple[str, Optional[str]]:
     if st.session_state.awaiting_dept_scope or st.session_state.awaiting_college_scope:
-        resolved = resolve_pending(user_text)
+        resolved = resolve_pending(data, user_text)
         if resolved: return resolved
 
-    if _looks_like_payment(user_text):
-        return (_refer_university(channel_hint="finance"), None)
-    
+    kind = _pre_classify(user_text)
+    fast = _fast_path(data, user_text, kind) if kind else None
+    fast_path_stats()[kind if fast else "spacy"] += 1
+    if fast:
+        return fast
+
     tlow = (user_text or "").lower().strip().rstrip("?!.")
-    ents = extract_entities(user_text)
-    intent = detect_intent(user_text)
+    ents = engine.extract_entities(user_text)
+    intent = engine.detect_intent(user_text)
 
     if intent == "lab_subjects":
-        return handle_lab_subjects(user_text, ents)
+        return handle_lab_subjects(data, user_text, ents)
 
     if intent == "max_units":
-        return handle_max_units(user_text, ents)
+        return handle_max_units(data, user_text, ents)
 
     has_units = bool(re.search(r"\bunits?\b", user_text.lower())) or \
                 bool(re.search(r"\bunits?\b", tlow)) or \
@@ -1464,27 +1561,17 @@ def route(user_text: str) -> Tuple[str, Optional[str]]:
     
     if intent == "when_taken":
         if c and match_type in ("code", "exact_title", "exact_title_subset", "alias", "high_confidence_fuzzy"):
-             return handle_when_taken(user_text, ents, course_obj=c)
+             return handle_when_taken(data, user_text, ents, course_obj=c)
         else:
-             return handle_when_taken(user_text, ents, course_obj=None)
+             return handle_when_taken(data, user_text, ents, course_obj=None)
 
     if c and match_type in ("code", "exact_title", "exact_title_subset", "alias", "high_confidence_fuzzy"):
-        if has_units: return handle_units(user_text, ents, course_obj=c)
-        if has_prereq: return handle_prereq(user_text, ents, course_obj=c)
-        return (
-            f"I found **{format_course(c)}**.\n\n"
-            "What do you need? I can check its **units**, **prerequisites**, "
-            "or verify if it's in your curriculum. ",
-            None
-        )
+        if has_units: return handle_units(data, user_text, ents, course_obj=c)
+        if has_prereq: return handle_prereq(data, user_text, ents, course_obj=c)
+        return _found_course_reply(c)
     
     if c and match_type == "fuzzy_code":
-         return (
-            f"I found a possible match: **{format_course(c)}**.\n\n"
-            "Is this the course you're looking for? "
-            "If yes, I can provide its **units** or **prerequisites**.",
-            None
-        )
+         return _possible_match_reply(c)
          
     cleaned_q = _clean_course_query(user_text)
     words = cleaned_q.split()
@@ -1492,30 +1579,30 @@ def route(user_text: str) -> Tuple[str, Optional[str]]:
     is_code = bool(CODE_RE.search(user_text)) or (len(words) == 1 and any(char.isdigit() for char in words[0]))
 
     if _is_generic_thesis_query(user_text) or _is_generic_nstp_query(user_text) or _is_generic_pathfit_query(user_text):
-        return handle_prereq(user_text, ents)
+        return handle_prereq(data, user_text, ents)
 
     strong_intent = intent in {"units", "prerequisites", "curriculum", "max_units"}
     
     if len(words) <= 1 and not is_code and not strong_intent and not any(w in tlow for w in ["abel", "bael", "who", "what", "where", "when", "why", "how", "list", "show"]):
          if cleaned_q in GREETINGS:
-             return ("Hey there! How can I help you today?", None)
+             return (GREETING_REPLY, None)
          return ("I'm a bit lost. Could you tell me exactly what you need in one sentence? Mention the course code or program and whether you need units, prerequisites, or the curriculum.", None)
 
     if "curriculum" in tlow:
-        return handle_curriculum(user_text, ents)
+        return handle_curriculum(data, user_text, ents)
 
     if tlow in {"department heads", "dept heads", "dept. heads", "different department heads"}:
-        return handle_dept_heads_list_or_clarify(user_text, ents)
+        return handle_dept_heads_list_or_clarify(data, user_text, ents)
     if intent == "courseinfo" and _is_dept_headish(user_text):
-        if ents.get("department"): return handle_dept_head_one(user_text, ents)
-        return handle_dept_heads_list_or_clarify(user_text, ents)
-    if intent == "dept_heads_list": return handle_dept_heads_list_or_clarify(user_text, ents)
-    if intent == "dept_head_one": return handle_dept_head_one(user_text, ents)
+        if ents.get("department"): return handle_dept_head_one(data, user_text, ents)
+        return handle_dept_heads_list_or_clarify(data, user_text, ents)
+    if intent == "dept_heads_list": return handle_dept_heads_list_or_clarify(data, user_text, ents)
+    if intent == "dept_head_one": return handle_dept_head_one(data, user_text, ents)
     if intent == "max_units":
-        return handle_max_units(user_text, ents)
+        return handle_max_units(data, user_text, ents)
     
     if intent == "major_minor_subjects":
-        return handle_major_minor_inquiry(user_text, ents)
+        return handle_major_minor_inquiry(data, user_text, ents)
 
     if intent == "vague_program":
         return (
@@ -1525,9 +1612,8 @@ def route(user_text: str) -> Tuple[str, Optional[str]]:
         )
 
     plain = tlow
-    nonnames = {"yes", "yeah", "yup", "ok", "okay", "sure", "thanks", "thank you"}
-    if plain in nonnames:
-        return ("Got it. If you have a specific question about a course or program, feel free to ask!", None)
+    if plain in ACKNOWLEDGEMENTS:
+        return (ACK_REPLY, None)
 
     if not ents.get("program") and intent == "units":
          prog_match = fuzzy_best_program(data["programs"], user_text, score_cutoff=85)
@@ -1536,11 +1622,11 @@ def route(user_text: str) -> Tuple[str, Optional[str]]:
              ents["program"] = p_row["program_name"]
 
     if ents.get("program") and not bool(CODE_RE.search(user_text)):
-        if intent == "units": return handle_units(user_text, ents)
+        if intent == "units": return handle_units(data, user_text, ents)
         if intent == "curriculum" or intent == "courseinfo": 
-            if intent == "curriculum": return handle_curriculum(user_text, ents)
+            if intent == "curriculum": return handle_curriculum(data, user_text, ents)
             if intent == "courseinfo" and (ents.get("year_num") or ents.get("term_num")): 
-                return handle_curriculum(user_text, ents)
+                return handle_curriculum(data, user_text, ents)
 
     raw_hits = fuzzy_top_course_titles(data["courses"], user_text, limit=30, score_cutoff=65)
     
@@ -1582,14 +1668,9 @@ def route(user_text: str) -> Tuple[str, Optional[str]]:
 
         if top_score >= 92 or is_perfect:
              c = top_course
-             if has_units or intent == "units": return handle_units(user_text, ents, course_obj=c)
-             if has_prereq or intent == "prerequisites": return handle_prereq(user_text, ents, course_obj=c)
-             return (
-                f"I found **{format_course(c)}**.\n\n"
-                "What do you need? I can check its **units**, **prerequisites**, "
-                "or verify if it's in your curriculum. ",
-                None
-            )
+             if has_units or intent == "units": return handle_units(data, user_text, ents, course_obj=c)
+             if has_prereq or intent == "prerequisites": return handle_prereq(data, user_text, ents, course_obj=c)
+             return _found_course_reply(c)
 
         if top_score >= 65:
             is_clear_winner = False
@@ -1601,18 +1682,13 @@ def route(user_text: str) -> Tuple[str, Optional[str]]:
                     is_clear_winner = True
             
             if c and (match_type in ("code", "exact_title", "exact_title_subset", "alias", "high_confidence_fuzzy")) and intent == "when_taken":
-                return handle_when_taken(user_text, ents, course_obj=c)
+                return handle_when_taken(data, user_text, ents, course_obj=c)
                 
             if is_clear_winner:
                 c = hits[0][2]
-                if has_units or intent == "units": return handle_units(user_text, ents, course_obj=c)
-                if has_prereq or intent == "prerequisites": return handle_prereq(user_text, ents, course_obj=c)
-                return (
-                    f"I found **{format_course(c)}**.\n\n"
-                    "What do you need? I can check its **units**, **prerequisites**, "
-                    "or verify if it's in your curriculum. ",
-                    None
-                )
+                if has_units or intent == "units": return handle_units(data, user_text, ents, course_obj=c)
+                if has_prereq or intent == "prerequisites": return handle_prereq(data, user_text, ents, course_obj=c)
+                return _found_course_reply(c)
             
             lines = ["I found a few courses with similar names. Could you type the specific course code or full title you need? Here are the ones I see:"]
             for i in range(min(len(hits), 6)):
@@ -1620,8 +1696,8 @@ def route(user_text: str) -> Tuple[str, Optional[str]]:
                 lines.append(f"• **{format_course(match_c)}**")
             return ("\n".join(lines), None)
 
-    if intent == "units": return handle_units(user_text, ents)
-    if intent == "prerequisites": return handle_prereq(user_text, ents)
+    if intent == "units": return handle_units(data, user_text, ents)
+    if intent == "prerequisites": return handle_prereq(data, user_text, ents)
 
     if ents.get("program"):
          return ("I'm not totally sure which part of that program you need. Could you specify subjects or prerequisites?", None)
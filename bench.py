@@ -0,0 +1,418 @@
+"""Benchmarks for the CASmate data and NLU layers.
+
+Usage:
+    python bench.py startup [--scales 1 10 100]
+    python bench.py coldstart
+    python bench.py fuzzy [--scales 1 10]
+    python bench.py typos [--scales 1 10]
+    python bench.py codes [--scales 1 10 100]
+    python bench.py nlu-batch [--lines 100000] [--batch-size 1000] [--workers 1 2]
+    python bench.py memory [--scales 1 100]
+    python bench.py workers [--counts 1 4 16] [--scale 10]
+"""
+import argparse
+import itertools
+import gc
+import json
+import multiprocessing
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from rapidfuzz import fuzz, process, utils
+
+import data_api
+import nlu_rules
+import prefork
+from records import Course
+
+
+def _best_of(fn: Callable[[], object], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _unmemoized(data: Dict, courses: List[Dict]) -> Dict:
+    """The catalog with `courses`, minus catalog_version so find_course_any
+    matches every time instead of answering repeats from its memo."""
+    scaled = dict(data, courses=courses)
+    scaled.pop("catalog_version", None)
+    return scaled
+
+
+def scaled_courses(courses: List[Dict], factor: int) -> List[Dict]:
+    """Replicate the catalog `factor` times with distinct codes and titles."""
+    if factor <= 1:
+        return list(courses)
+    out: List[Dict] = []
+    for k in range(factor):
+        for c in courses:
+            row = dict(c)
+            if k:
+                row["course_code"] = f"{c['course_code']} X{k}"
+                row["course_title"] = f"{c['course_title']} {k}"
+            out.append(Course.from_dict(row))
+    return out
+
+
+def scaled_datadir(factor: int) -> Path:
+    """Copy the default college's catalog to a temp dir with courses.json scaled by `factor`."""
+    tmp = Path(tempfile.mkdtemp(prefix=f"casmate-x{factor}-"))
+    for src in data_api.DATADIR.glob("*.json"):
+        shutil.copy(src, tmp / src.name)
+    with open(data_api.DATADIR / "courses.json", "r", encoding="utf-8") as f:
+        courses = json.load(f)
+    with open(tmp / "courses.json", "w", encoding="utf-8") as f:
+        json.dump([dict(c) for c in scaled_courses(courses, factor)], f)
+    return tmp
+
+
+def bench_startup(args) -> None:
+    print(f"{'scale':>6} {'courses':>8} {'load_all':>10} {'engine':>10} {'gazetteers':>11} {'rebuild':>9} {'cache hit':>10}")
+    original = data_api.DATADIR
+    for factor in args.scales:
+        tmp = scaled_datadir(factor)
+        data_api.DATADIR = tmp
+        try:
+            data = data_api.load_all()
+            t_load = _best_of(data_api.load_all)
+
+            catalog = (data["programs"], data["courses"], data["departments"])
+            t_engine = _best_of(lambda: nlu_rules.NLUEngine.build(*catalog))
+            empty = nlu_rules.NLUEngine.build()
+            t_cold = _best_of(lambda: empty.with_catalog(*catalog))
+            engine = empty.with_catalog(*catalog)
+            t_warm = _best_of(lambda: engine.with_catalog(*catalog))
+
+            cache_path = tmp / "nlu_compiled.pkl"
+            files = data_api.catalog_files(tmp)
+            nlu_rules.load_or_build_gazetteers(data, files, cache_path)
+            t_hit = _best_of(lambda: nlu_rules.load_or_build_gazetteers(data, files, cache_path))
+        finally:
+            data_api.DATADIR = original
+            shutil.rmtree(tmp, ignore_errors=True)
+        print(f"{factor:>5}x {len(data['courses']):>8} {t_load * 1000:>8.1f}ms {t_engine * 1000:>8.1f}ms {t_cold * 1000:>9.1f}ms {t_warm * 1000:>7.1f}ms {t_hit * 1000:>8.1f}ms")
+
+
+COLDSTART_SCRIPT = """
+import json, time
+t = {}
+def step(name, fn):
+    start = time.perf_counter()
+    out = fn()
+    t[name] = time.perf_counter() - start
+    return out
+step("import streamlit", lambda: __import__("streamlit"))
+data_api = step("import data_api", lambda: __import__("data_api"))
+nlu_rules = step("import nlu_rules", lambda: __import__("nlu_rules"))
+step("import spacy", lambda: __import__("spacy"))
+data = step("load_all", data_api.load_all)
+step("build_gazetteers", lambda: nlu_rules.NLUEngine.build(data["programs"], data["courses"], data["departments"]))
+print(json.dumps(t))
+"""
+
+
+def bench_coldstart(args) -> None:
+    """Time each startup step in a fresh interpreter, as a new server would."""
+    runs = []
+    for _ in range(args.repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", COLDSTART_SCRIPT],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    steps = {name: min(r[name] for r in runs) for name in runs[0]}
+    for name, t in steps.items():
+        print(f"{name:>18} {t * 1000:>8.1f}ms")
+    # app.py imports the catalog modules on its bootstrap thread.
+    header = steps["import streamlit"]
+    print(f"{'header (deferred)':>18} {header * 1000:>8.1f}ms")
+    print(f"{'ready':>18} {sum(steps.values()) * 1000:>8.1f}ms")
+
+
+def sample_queries() -> List[str]:
+    """Realistic prompts: the sample questions plus every course title and code."""
+    data = data_api.load_all()
+    queries = [line.strip() for line in (Path(__file__).parent / "question.md").read_text(encoding="utf-8").splitlines() if line.strip()]
+    queries += [c["course_title"] for c in data["courses"]]
+    queries += [f"prereq of {c['course_code']}" for c in data["courses"]]
+    return queries
+
+
+def misspell(title: str, k: int) -> str:
+    """Deterministically garble the longest word of a title: swap, drop or double a letter."""
+    words = title.split()
+    i = max(range(len(words)), key=lambda j: len(words[j]))
+    w = words[i]
+    if len(w) < 5:
+        return title
+    p = 1 + k % (len(w) - 3)
+    if k % 3 == 0:
+        w = w[:p] + w[p + 1] + w[p] + w[p + 2:]
+    elif k % 3 == 1:
+        w = w[:p] + w[p + 1:]
+    else:
+        w = w[:p] + w[p] + w[p:]
+    return " ".join(words[:i] + [w] + words[i + 1:])
+
+
+def bench_typos(args) -> None:
+    data = data_api.load_all()
+    cases = []
+    for k, c in enumerate(data["courses"]):
+        bad = misspell(c["course_title"], k)
+        if bad != c["course_title"]:
+            cases.append((bad, c["course_title"]))
+    print(f"{len(cases)} misspelled course titles, mean per query")
+    print(f"{'scale':>6} {'courses':>8} {'mode':>9} {'found':>7} {'time':>9} {'index':>9}")
+    original = data_api.TYPO_MAX_EDIT_DISTANCE
+    for factor in args.scales:
+        scaled = _unmemoized(data, scaled_courses(data["courses"], factor))
+        stats = data_api.typo_index_stats(scaled)
+        size = sum(s["bytes"] for s in stats.values()) / 1e6
+        for mode, distance in (("cascade", 0), ("typo", original)):
+            data_api.TYPO_MAX_EDIT_DISTANCE = distance
+            try:
+                hits = data_api.find_courses_bulk(scaled, [bad for bad, _ in cases])
+                found = sum(1 for (c, _, _), (_, want) in zip(hits, cases) if c and c["course_title"] == want)
+                t = _best_of(lambda: [data_api.find_course_any(scaled, bad) for bad, _ in cases]) / len(cases) * 1000
+            finally:
+                data_api.TYPO_MAX_EDIT_DISTANCE = original
+            print(f"{factor:>5}x {len(scaled['courses']):>8} {mode:>9} {found:>3}/{len(cases):<3} {t:>7.2f}ms {size:>7.1f}MB")
+
+
+def bench_codes(args) -> None:
+    data = data_api.load_all()
+    queries = []
+    for k, c in enumerate(data["courses"]):
+        code = c["course_code"]
+        p = k % (len(code) - 1)
+        # Alternate between a swapped and a dropped character.
+        queries.append(code[:p] + code[p + 1] + code[p] + code[p + 2:] if k % 2 else code[:p] + code[p + 1:])
+    queries += [f"prereq of {q}" for q in queries]
+    print(f"{len(queries)} garbled course codes, mean per query")
+    print(f"{'scale':>6} {'codes':>8} {'full scan':>10} {'index':>9} {'build':>9}")
+    for factor in args.scales:
+        courses = scaled_courses(data["courses"], factor)
+        codes = [c["course_code"] for c in courses]
+        start = time.perf_counter()
+        data_api._best_code(courses, "warm up", 65)
+        t_build = time.perf_counter() - start
+        t_full = _best_of(lambda: [
+            process.extractOne(q, codes, scorer=fuzz.ratio, score_cutoff=65, processor=utils.default_process) for q in queries
+        ]) / len(queries) * 1000
+        t_index = _best_of(lambda: [data_api._best_code(courses, q, 65) for q in queries]) / len(queries) * 1000
+        print(f"{factor:>5}x {len(codes):>8} {t_full:>8.3f}ms {t_index:>7.3f}ms {t_build * 1000:>7.1f}ms")
+
+
+def bench_nlu_batch(args) -> None:
+    data = data_api.load_all()
+    engine = nlu_rules.NLUEngine.build(data["programs"], data["courses"], data["departments"])
+    queries = sample_queries()
+
+    def log():
+        return itertools.islice(itertools.cycle(queries), args.lines)
+
+    def one_by_one():
+        for text in log():
+            engine.detect_intent(text)
+            engine.extract_entities(text)
+
+    def batched(n_process):
+        def run():
+            for _ in engine.detect_intents(log(), args.batch_size, n_process):
+                pass
+            for _ in engine.extract_entities_batch(log(), args.batch_size, n_process):
+                pass
+        return run
+
+    print(f"{args.lines} lines, intent + entities")
+    rows = [("one by one", one_by_one)]
+    rows += [(f"batched x{n}", batched(n)) for n in args.workers]
+    for name, fn in rows:
+        t = _best_of(fn, repeat=1)
+        print(f"{name:>12} {t:>8.2f}s {args.lines / t:>10.0f} lines/s")
+
+
+def bench_fuzzy(args) -> None:
+    data = data_api.load_all()
+    queries = [line.strip() for line in (Path(__file__).parent / "question.md").read_text(encoding="utf-8").splitlines() if line.strip()]
+    print(f"{len(queries)} queries, mean per query")
+    print(f"{'scale':>6} {'courses':>8} {'per-call':>10} {'top titles':>11} {'best title':>11} {'find_course_any':>16} {'bulk':>9}")
+    for factor in args.scales:
+        scaled = _unmemoized(data, scaled_courses(data["courses"], factor))
+        courses = scaled["courses"]
+        data_api.fuzzy_top_course_titles(courses, "warm up")
+
+        def per_query(fn):
+            return _best_of(lambda: [fn(q) for q in queries]) / len(queries) * 1000
+
+        def per_call(q):
+            # What fuzzy_top_course_titles did before choices were cached:
+            # rebuild the dict and re-process every title on each query.
+            choices = {c["course_title"]: c for c in courses if c.get("course_title")}
+            clean_q = data_api._clean_course_query(q) or q
+            return process.extract(clean_q, choices.keys(), scorer=fuzz.token_set_ratio, limit=30, score_cutoff=65, processor=utils.default_process)
+
+        t_base = per_query(per_call)
+        t_top = per_query(lambda q: data_api.fuzzy_top_course_titles(courses, q, limit=30, score_cutoff=65))
+        t_best = per_query(lambda q: data_api.fuzzy_best_course_title(courses, q, score_cutoff=80))
+        t_any = per_query(lambda q: data_api.find_course_any(scaled, q))
+        t_bulk = _best_of(lambda: data_api.find_courses_bulk(scaled, queries)) / len(queries) * 1000
+        print(f"{factor:>5}x {len(courses):>8} {t_base:>8.2f}ms {t_top:>9.2f}ms {t_best:>9.2f}ms {t_any:>14.2f}ms {t_bulk:>7.2f}ms")
+
+
+def _retained_bytes(build: Callable[[], object]) -> int:
+    """Bytes still allocated by build() once its temporaries are freed."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def bench_memory(args) -> None:
+    data = data_api.load_all()
+    tables = {
+        "courses": ("course_id", data["courses"]),
+        "plan": ("course_id", data["plan"]),
+        "prereqs": ("course_id", data["prereqs"]),
+        "programs": ("program_id", data["programs"]),
+        "departments": ("department_id", data["departments"]),
+    }
+    print("Retained size after parsing each table from JSON text, as plain dicts vs slotted records")
+    print(f"{'scale':>6} {'table':>12} {'rows':>8} {'dicts':>10} {'records':>10} {'saved':>7}")
+    for factor in args.scales:
+        for name, (id_key, rows) in tables.items():
+            record_type = type(rows[0])
+            plain = [{k: v for k, v in r.items() if k != "flags"} for r in rows]
+            text = json.dumps([dict(r, **{id_key: f"{r[id_key]} X{k}"}) if k else r for k in range(factor) for r in plain])
+            as_dicts = _retained_bytes(lambda: json.loads(text))
+            as_records = _retained_bytes(lambda: [record_type.from_dict(r) for r in json.loads(text)])
+            print(
+                f"{factor:>5}x {name:>12} {len(rows) * factor:>8} {as_dicts / 1024:>8.0f}KB {as_records / 1024:>8.0f}KB"
+                f" {1 - as_records / as_dicts:>6.0%}"
+            )
+
+
+def _smaps() -> Dict[str, int]:
+    """Pss and private (unshared) memory of this process in KB, from /proc."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"pss": fields["Pss"], "private": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def _serve(data: Dict, results, barrier) -> None:
+    for q in sample_queries():
+        data_api.find_course_any(data, q)
+        nlu_rules.detect_intent(q)
+        nlu_rules.extract_entities(q)
+    # Measure once every worker is up, then stay alive until all have.
+    barrier.wait()
+    results.put(_smaps())
+    barrier.wait()
+
+
+def _private_worker(datadir: Path, results, barrier) -> None:
+    data_api.DATADIR = datadir
+    data = data_api.load_all("memory")
+    nlu_rules.load_or_build_gazetteers(data, data_api.catalog_files(datadir), path=datadir / "nlu.pkl")
+    _serve(data, results, barrier)
+
+
+def bench_workers(args) -> None:
+    datadir = scaled_datadir(args.scale)
+    data_api.DATADIR = datadir
+    data_api.SQLITE_PATH = datadir / "catalog.sqlite3"
+    # Fill both caches once so neither mode pays for building them.
+    data = data_api.load_all("sqlite")
+    nlu_rules.load_or_build_gazetteers(data, data_api.catalog_files(datadir), path=datadir / "nlu.pkl")
+    print(f"{args.scale}x catalog, {len(data['courses'])} courses; memory in MB, host total includes the parent")
+    print(f"{'workers':>8} {'mode':>8} {'host Pss':>9} {'per worker':>11} {'private/worker':>15}")
+
+    def run(ctx, n: int, target: Callable, *args) -> None:
+        results, barrier = ctx.Queue(), ctx.Barrier(n + 1)
+        workers = [ctx.Process(target=target, args=args + (results, barrier)) for _ in range(n)]
+        for w in workers:
+            w.start()
+        barrier.wait()
+        parent = _smaps()
+        sizes = [results.get() for _ in workers]
+        barrier.wait()
+        for w in workers:
+            w.join()
+        host = parent["pss"] + sum(s["pss"] for s in sizes)
+        print(
+            f"{n:>8} {mode:>8} {host / 1024:>9.0f} {(host - parent['pss']) / n / 1024:>11.0f}"
+            f" {sum(s['private'] for s in sizes) / n / 1024:>15.0f}"
+        )
+
+    mode = "private"
+    for n in args.counts:
+        run(multiprocessing.get_context("spawn"), n, _private_worker, datadir)
+    mode = "shared"
+    data = prefork.preload("sqlite", nlu_cache=datadir / "nlu.pkl")
+    for n in args.counts:
+        run(multiprocessing.get_context("fork"), n, _serve, data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CASmate benchmarks")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("startup", help="load_all, build_gazetteers and the compiled NLU cache at scaled catalog sizes")
+    p.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("coldstart", help="import time, load_all and build_gazetteers in a fresh interpreter")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_coldstart)
+
+    p = sub.add_parser("fuzzy", help="course title matching at scaled catalog sizes")
+    p.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    p.set_defaults(func=bench_fuzzy)
+
+    p = sub.add_parser("typos", help="find_course_any on misspelled titles with and without the typo index")
+    p.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    p.set_defaults(func=bench_typos)
+
+    p = sub.add_parser("codes", help="fuzzy course-code lookup: full rapidfuzz scan vs the pivot index")
+    p.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    p.set_defaults(func=bench_codes)
+
+    p = sub.add_parser("nlu-batch", help="detect_intent/extract_entities one by one vs the batch API")
+    p.add_argument("--lines", type=int, default=100_000)
+    p.add_argument("--batch-size", type=int, default=nlu_rules.NLU_BATCH_SIZE)
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    p.set_defaults(func=bench_nlu_batch)
+
+    p = sub.add_parser("memory", help="memory of the course, plan, prereq, program and department rows: dicts vs slotted records")
+    p.add_argument("--scales", type=int, nargs="+", default=[1, 100])
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser("workers", help="host memory of N worker processes: each loading its own catalog vs forked from a preloaded one")
+    p.add_argument("--counts", type=int, nargs="+", default=[1, 4, 16])
+    p.add_argument("--scale", type=int, default=10)
+    p.set_defaults(func=bench_workers)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Per-college catalogs, loaded on first reference and evicted when idle.
+
+Each directory under data/colleges/ holds one college's catalog files. A
+ShardRouter loads a college's catalog, lookup indexes and NLU engine the
+first time a message refers to it, and drops them again after
+SHARD_IDLE_SECONDS without use. The default college is never dropped.
+"""
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import data_api
+import nlu_rules
+from alias_registry import ALIASES, AliasRegistry, alias_key
+
+SHARD_IDLE_SECONDS = 30 * 60
+
+
+class CollegeShard(NamedTuple):
+    college: str
+    data: Dict
+    engine: nlu_rules.NLUEngine
+
+
+class ShardRouter:
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        default: str = data_api.DEFAULT_COLLEGE,
+        idle_seconds: float = SHARD_IDLE_SECONDS,
+        backend: Optional[str] = None,
+    ):
+        self.root = Path(root or data_api.COLLEGES_DIR)
+        self.default = default
+        self.idle_seconds = idle_seconds
+        self.backend = backend
+        self._shards: Dict[str, CollegeShard] = {}
+        self._last_used: Dict[str, float] = {}
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._programs: Optional[AliasRegistry] = None
+
+    def colleges(self) -> List[str]:
+        """Every college with a catalog on disk, the default first."""
+        if not self.root.is_dir():
+            return []
+        found = sorted(p.name for p in self.root.iterdir() if self.has(p.name))
+        return sorted(found, key=lambda c: c != self.default)
+
+    def has(self, college: Optional[str]) -> bool:
+        return bool(college) and (self.root / college / "courses.json").is_file()
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return sorted(self._shards)
+
+    def adopt(self, college: str, data: Dict, engine: nlu_rules.NLUEngine) -> CollegeShard:
+        """Register a catalog that is already loaded, such as the app's own."""
+        shard = CollegeShard(college, data, engine)
+        with self._lock:
+            self._shards[college] = shard
+            self._last_used[college] = time.monotonic()
+        return shard
+
+    def get(self, college: Optional[str]) -> Optional[CollegeShard]:
+        """The shard of `college`, loading it on first use; None if there is no catalog for it."""
+        if not self.has(college):
+            return None
+        self.evict_idle()
+        with self._lock:
+            loading = self._loading.setdefault(college, threading.Lock())
+        with loading:
+            with self._lock:
+                shard = self._shards.get(college)
+            if shard is None:
+                shard = self._load(college)
+                with self._lock:
+                    self._shards[college] = shard
+            with self._lock:
+                self._last_used[college] = time.monotonic()
+        return shard
+
+    def _load(self, college: str) -> CollegeShard:
+        datadir = (self.root / college).resolve()
+        data = data_api.load_all(self.backend, datadir)
+        path = nlu_rules.NLU_CACHE_PATH
+        if datadir != data_api.DATADIR:
+            path = path.with_name(f"{path.stem}-{college}{path.suffix}")
+        engine = nlu_rules.load_or_build_engine(data, data_api.catalog_files(datadir), path, base=nlu_rules.get_engine())
+        return CollegeShard(college, data, engine)
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """Drop the shards unused for idle_seconds; returns their colleges."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [
+                c for c in self._shards
+                if c != self.default and now - self._last_used.get(c, now) > self.idle_seconds
+            ]
+            dropped = [self._shards.pop(c) for c in idle]
+        for shard in dropped:
+            data_api.drop_catalog(shard.data)
+        return idle
+
+    def college_for(self, text: str) -> Optional[str]:
+        """The college a message names, or else the college of a program it names."""
+        hit = ALIASES.first(text, "college")
+        if hit:
+            return hit.target
+        hit = self._program_owners().first(text, "program")
+        return hit.target if hit else None
+
+    def route(self, text: str) -> Optional[CollegeShard]:
+        """The shard to answer `text` from: the one it refers to if on hand, else the default."""
+        return self.get(self.college_for(text)) or self.get(self.default)
+
+    def _program_owners(self) -> AliasRegistry:
+        # Only programs.json is read for every college; the rest of a
+        # catalog loads when a message first refers to it.
+        if self._programs is None:
+            aliases = ALIASES.table("program")
+            owners: Dict[str, List[str]] = {}
+            for college in self.colleges():
+                names = owners.setdefault(college, [])
+                for p in data_api._load_json("programs.json", self.root / college):
+                    full = p.get("program_name") or ""
+                    names += [n for n in (full, p.get("short_name"), p.get("program_id")) if n]
+                    names += [a for a, target in aliases.items() if alias_key(target) == alias_key(full)]
+            self._programs = AliasRegistry({"program": owners})
+        return self._programs
@@ -1,74 +1,41 @@
+import bisect
+import hashlib
+import itertools
 import json
+import os
 import re
+import threading
+import unicodedata
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
 
+import numpy as np
 from rapidfuzz import process, fuzz, utils
 
-DATADIR = (Path(__file__).parent / "data").resolve()
+from alias_registry import ALIASES, ALIASES_PATH
+from lru_memo import LRUMemo
+from metric_index import PivotIndex
+from records import Course, Department, PlanEntry, Prerequisite, Program
+from sqlite_store import SQLiteCatalog, SQLiteTable, build_database, open_catalog, source_key_of
+from trigram_index import TrigramIndex
+from typo_index import DeletionIndex
+
+# One directory of catalog files per college under data/colleges/.
+COLLEGES_DIR = (Path(__file__).parent / "data" / "colleges").resolve()
+DEFAULT_COLLEGE = "CAS"
+DATADIR = COLLEGES_DIR / DEFAULT_COLLEGE
+CATALOG_FILES = ("departments.json", "programs.json", "courses.json", "curriculum_plan.json", "prerequisites.json", "faculty.json")
+BACKEND = os.environ.get("CASMATE_BACKEND", "memory")
+SQLITE_PATH = Path(__file__).parent / ".cache" / "catalog.sqlite3"
 
-_WS = re.compile(r"\s+")
 _PUNCT = re.compile(r"[^\w\s]")
 CODE_RE = re.compile(r"\b([A-Za-z]{2,4})[\s-]?(\d{2,})\b")
 
-PROGRAM_ABBREV = {
-    "CS": "Bachelor of Science in Computer Science",
-    "BSCS": "Bachelor of Science in Computer Science",
-    "COMPUTER SCIENCE": "Bachelor of Science in Computer Science",
-    "COMP SCI": "Bachelor of Science in Computer Science",
-    "COMSCI": "Bachelor of Science in Computer Science",
-    "COM SCI": "Bachelor of Science in Computer Science",
-    "BS COMP SCI": "Bachelor of Science in Computer Science",
-    "BSCOMP SCI": "Bachelor of Science in Computer Science",
-    "BS COM SCI": "Bachelor of Science in Computer Science",
-    "BSCOMSCI": "Bachelor of Science in Computer Science",
-    "PSYCH": "Bachelor of Science in Psychology",
-    "BS PSYCH": "Bachelor of Science in Psychology",
-    "BSPSYCH": "Bachelor of Science in Psychology",
-    "PSYCHOLOGY": "Bachelor of Science in Psychology",
-    "BS PSYCHOLOGY": "Bachelor of Science in Psychology",
-    "POLSAY": "Bachelor of Arts in Political Science",
-    "POLSCI": "Bachelor of Arts in Political Science",
-    "AB POLSCI": "Bachelor of Arts in Political Science",
-    "ABPOLSCI": "Bachelor of Arts in Political Science",
-    "BAPOLSCI": "Bachelor of Arts in Political Science",
-    "BA POLSCI": "Bachelor of Arts in Political Science",
-    "POLITICAL SCIENCE": "Bachelor of Arts in Political Science",
-    "POLS": "Bachelor of Arts in Political Science",
-    "AB PS": "Bachelor of Arts in Political Science",
-    "ABPS": "Bachelor of Arts in Political Science",
-    "BAPS": "Bachelor of Arts in Political Science",
-    "BA PS": "Bachelor of Arts in Political Science",
-    "BAEL": "BA in English Language",
-    "ABEL": "BA in English Language",
-    "BACOMM": "Bachelor of Arts in Communication",
-    "COMM": "Bachelor of Arts in Communication",
-    "COMMUNICATION": "Bachelor of Arts in Communication",
-    "ABCOMM": "Bachelor of Arts in Communication",
-    "AB COMM": "Bachelor of Arts in Communication",
-    "BA COMM": "Bachelor of Arts in Communication",
-    "BIO": "Bachelor of Science in Biology",
-    "BS BIO": "Bachelor of Science in Biology",
-    "BSBIO": "Bachelor of Science in Biology",
-    "BIOLOGY": "Bachelor of Science in Biology",
-}
+T = TypeVar("T")
 
-DEPT_SYNONYMS = {
-    "CAS": "D-CAS",
-    "COLLEGE OF ARTS AND SCIENCES": "D-CAS",
-    "COMPUTER SCIENCE": "D-CS",
-    "COMP SCI": "D-CS",
-    "CS": "D-CS",
-    "SOCIAL SCIENCES": "D-SS",
-    "SOCSCI": "D-SS",
-    "LANGUAGE AND LITERATURE": "D-LL",
-    "LANG & LIT": "D-LL",
-    "LANG LIT": "D-LL",
-    "NATURAL SCIENCES": "D-NS",
-    "NATSCI": "D-NS",
-    "MATHEMATICS": "D-MATH",
-    "MATH": "D-MATH",
-}
+BULK_CHUNK_SIZE = 256
+TYPO_MAX_EDIT_DISTANCE = 2
 
 COURSE_TERM_SYNONYMS = {
     "stats": "statistics",
@@ -79,58 +46,93 @@ COURSE_TERM_SYNONYMS = {
     "lec": "lecture"
 }
 
-COURSE_ALIASES = {
-    "introduction programming": "Fundamentals of Programming",
-    "fundamentals programming": "Fundamentals of Programming",
-    "intermediate programming": "Intermediate Programming",
-    "intro computing": "Introduction to Computing",
-    "introduction computing": "Introduction to Computing",
-    "automata": "Automata Theory and Formal Languages",
-    "automata theory": "Automata Theory and Formal Languages",
-    "data structures": "Data Structures and Algorithm",
-    "data structure": "Data Structures and Algorithm",
-    "math modern world": "Mathematics in the Modern World",
-    "mathematics modern world": "Mathematics in the Modern World",
-    "advertising principle": "Advertising Principles and Practice",
-    "advertising principles": "Advertising Principles and Practice",
-    "gen zoology": "General Zoology",
-    "general zoology": "General Zoology",
-    "gen zoo": "General Zoology",
-    "microbio": "Microbiology",
-    "botany": "General Botany",
-    "zoology": "General Zoology"
+# Text helpers are pure functions of their input and find_course_any of its
+# input and the catalog, so their results are memoized; find_course_any per
+# catalog version and courses list. Dropping a catalog's tables (a reload of
+# its college, or an evicted shard) drops its entries.
+MEMO_MAXSIZE = 4096
+_catalog_version = 0
+_query_forms_memo = LRUMemo(MEMO_MAXSIZE)
+_course_match_memo = LRUMemo(MEMO_MAXSIZE)
+_MEMOS = {
+    "query_forms": _query_forms_memo,
+    "find_course_any": _course_match_memo,
 }
 
+
+def memo_stats() -> Dict[str, Dict[str, int]]:
+    return {name: memo.stats() for name, memo in _MEMOS.items()}
+
+
+COURSE_STOP_WORDS = frozenset({
+    "what", "whats", "what's", "is", "are", "the", "of", "for", "in", "on", "to", "and",
+    "subject", "course", "subjects", "courses",
+    "prereq", "prereqs", "prerequisite", "prerequisites",
+    "requirement", "requirements",
+    "about", "regarding", "do", "does", "should",
+    "need", "take", "before", "prior",
+    "how", "many", "unit", "units", "load", "total", "there",
+    "i", "we", "my", "students", "student",
+    "when", "where", "which", "year", "yr", "level", "sem", "semester", "trimester", "term",
+})
+
+PROGRAM_STOP_WORDS = frozenset({
+    "what", "whats", "what's", "how", "many", "is", "are", "does", "do",
+    "the", "a", "an", "of", "for", "in", "on", "about", "regarding",
+    "take", "need", "unit", "units", "load", "total", "year", "yr",
+    "freshman", "sophomore", "junior", "senior",
+    "first", "1st", "second", "2nd", "third", "3rd", "fourth", "4th",
+    "sem", "sem.", "semester", "trimester", "term",
+})
+
+# str.translate equivalent of _PUNCT.sub(" ", ...) for ASCII text.
+_ASCII_PUNCT_TABLE = {i: " " for i in range(128) if _PUNCT.match(chr(i))}
+
+
+def _query_forms_uncached(text: str) -> Tuple[str, str, str]:
+    """Normalized phrase, course-query and program-query forms from one scan.
+
+    Lowercases, turns punctuation into spaces, singularizes words longer
+    than three letters, then for the course form maps COURSE_TERM_SYNONYMS
+    and drops COURSE_STOP_WORDS, and for the program form drops
+    PROGRAM_STOP_WORDS. A form left empty falls back to the normalized phrase.
+    """
+    t = (text or "").lower()
+    t = t.translate(_ASCII_PUNCT_TABLE) if t.isascii() else _PUNCT.sub(" ", t)
+    norm: List[str] = []
+    course: List[str] = []
+    program: List[str] = []
+    for tok in t.split():
+        if len(tok) > 3 and tok.endswith("s"):
+            tok = tok[:-1]
+        norm.append(tok)
+        if tok not in PROGRAM_STOP_WORDS:
+            program.append(tok)
+        tok = COURSE_TERM_SYNONYMS.get(tok, tok)
+        if tok not in COURSE_STOP_WORDS and not tok.startswith(("prereq", "requirement")):
+            course.append(tok)
+    base = " ".join(norm)
+    return base, " ".join(course) or base, " ".join(program) or base
+
+
+def _query_forms(text: str) -> Tuple[str, str, str]:
+    return _query_forms_memo.get(text, lambda: _query_forms_uncached(text))
+
+
 def _normalize_phrase(s: str) -> str:
-    t = (s or "").lower()
-    t = _PUNCT.sub(" ", t)
-    t = _WS.sub(" ", t).strip()
-    if not t:
-        return ""
-    parts = t.split()
-    singular_parts = [p[:-1] if len(p) > 3 and p.endswith("s") else p for p in parts]
-    return " ".join(singular_parts)
+    return _query_forms(s)[0]
+
+
+def _normalize_phrase_uncached(s: str) -> str:
+    return _query_forms_uncached(s)[0]
 
 
 def _clean_course_query(text: str) -> str:
-    base = _normalize_phrase(text)
-    if not base:
-        return base
-    tokens = base.split()
-    tokens = [COURSE_TERM_SYNONYMS.get(t, t) for t in tokens]
-    remove = {
-        "what", "whats", "what's", "is", "are", "the", "of", "for", "in", "on", "to", "and",
-        "subject", "course", "subjects", "courses",
-        "prereq", "prereqs", "prerequisite", "prerequisites",
-        "requirement", "requirements",
-        "about", "regarding", "do", "does", "should",
-        "need", "take", "before", "prior",
-        "how", "many", "unit", "units", "load", "total", "there",
-        "i", "we", "my", "students", "student",
-        "when", "where", "which", "year", "yr", "level", "sem", "semester", "trimester", "term"
-    }
-    kept = [t for t in tokens if t not in remove and not t.startswith("prereq") and not t.startswith("requirement")]
-    return " ".join(kept) if kept else base
+    return _query_forms(text)[1]
+
+
+def _clean_program_query(text: str) -> str:
+    return _query_forms(text)[2]
 
 
 def get_course_curriculum_entries(plan: List[Dict], course_id: str) -> List[Dict]:
@@ -139,6 +141,9 @@ def get_course_curriculum_entries(plan: List[Dict], course_id: str) -> List[Dict
     
     matches = []
     cid_target = str(course_id).strip().upper()
+    catalog = _sqlite_catalog(plan)
+    if catalog:
+        return catalog.plan_entries(cid_target)
     
     for entry in plan:
         e_cid = str(entry.get("course_id") or "").strip().upper()
@@ -147,44 +152,99 @@ def get_course_curriculum_entries(plan: List[Dict], course_id: str) -> List[Dict
             
     return matches
 
-def _clean_program_query(text: str) -> str:
-    base = _normalize_phrase(text)
-    if not base:
-        return base
-    tokens = base.split()
-    remove = {
-        "what", "whats", "what's", "how", "many", "is", "are", "does", "do",
-        "the", "a", "an", "of", "for", "in", "on", "about", "regarding",
-        "take", "need", "unit", "units", "load", "total", "year", "yr",
-        "freshman", "sophomore", "junior", "senior",
-        "first", "1st", "second", "2nd", "third", "3rd", "fourth", "4th",
-        "sem", "sem.", "semester", "trimester", "term",
-    }
-    kept = [t for t in tokens if t not in remove]
-    return " ".join(kept) if kept else base
+STREAM_CHUNK_SIZE = 1 << 20
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+# The decoder reports a token cut off at the end of the text ("-Infinit",
+# "1e+", a split \u escape) at most this many characters before the end.
+_PARTIAL_TOKEN = 10
+
+
+def _cut_off(e: json.JSONDecodeError, text: str) -> bool:
+    """Whether `e` may only mean that `text` ends partway through a value."""
+    return e.msg.startswith("Unterminated string") or len(text) - e.pos < _PARTIAL_TOKEN
 
 
-def _read_json_clean(path: Path) -> List[Dict]:
+def _iter_json_objects(path: Path, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Dict]:
+    """Yield the objects of a file holding one JSON list, one at a time.
+
+    Only the object being decoded and about one chunk of text are in memory
+    at once, so a registrar export is never parsed whole.
+    """
+    decoder = json.JSONDecoder()
+    not_a_list = f"JSON file {path} must contain a list of objects"
     with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    if not isinstance(data, list):
-        raise ValueError(f"JSON file {path} must contain a list of objects")
-    cleaned_data: List[Dict] = []
-    for item in data:
-        cleaned_item: Dict = {}
-        for key, value in item.items():
-            clean_key = key.strip() if isinstance(key, str) else key
-            clean_value = value.strip() if isinstance(value, str) else value
-            cleaned_item[clean_key] = clean_value
-        cleaned_data.append(cleaned_item)
-    return cleaned_data
-
-
-def _load_json(name: str) -> List[Dict]:
-    path = (DATADIR / name).resolve()
+        buf, pos = "", 0
+
+        def peek() -> str:
+            # The next non-whitespace character, reading on as needed; "" at the end.
+            nonlocal buf, pos
+            while True:
+                pos = _JSON_WS.match(buf, pos).end()
+                if pos < len(buf):
+                    return buf[pos]
+                buf, pos = f.read(chunk_size), 0
+                if not buf:
+                    return ""
+
+        if peek() != "[":
+            raise ValueError(not_a_list)
+        pos += 1
+        if peek() == "]":
+            pos += 1
+        else:
+            while True:
+                if peek() != "{":
+                    raise ValueError(not_a_list)
+                while True:
+                    try:
+                        item, pos = decoder.raw_decode(buf, pos)
+                        break
+                    except json.JSONDecodeError as e:
+                        if not _cut_off(e, buf):
+                            raise
+                        # The object runs past the buffer. Reading as much
+                        # again as it holds keeps the copying linear.
+                        more = f.read(max(chunk_size, len(buf) - pos))
+                        if not more:
+                            raise
+                        buf, pos = buf[pos:] + more, 0
+                yield item
+                sep = peek()
+                pos += 1
+                if sep == "]":
+                    break
+                if sep != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos - 1)
+        if peek():
+            raise json.JSONDecodeError("Extra data", buf, pos)
+
+
+def _clean_row(item: Dict) -> Dict:
+    """Strip the keys and string values of one object, in place unless a key changes."""
+    if any(isinstance(k, str) and k != k.strip() for k in item):
+        return {
+            (k.strip() if isinstance(k, str) else k): (v.strip() if isinstance(v, str) else v)
+            for k, v in item.items()
+        }
+    for key, value in item.items():
+        if isinstance(value, str):
+            item[key] = value.strip()
+    return item
+
+
+def _iter_json_clean(path: Path) -> Iterator[Dict]:
+    return (_clean_row(item) for item in _iter_json_objects(path))
+
+
+def _stream_json(name: str, datadir: Optional[Path] = None) -> Iterator[Dict]:
+    path = ((datadir or DATADIR) / name).resolve()
     if not path.exists():
         raise FileNotFoundError(f"Missing data file: {path}")
-    return _read_json_clean(path)
+    return _iter_json_clean(path)
+
+
+def _load_json(name: str, datadir: Optional[Path] = None) -> List[Dict]:
+    return list(_stream_json(name, datadir))
 
 
 def _credit_units_to_int(val) -> int:
@@ -201,22 +261,56 @@ def _credit_units_to_int(val) -> int:
         return 0
 
 
-def _flatten_plan(plan_raw: List[Dict]) -> List[Dict]:
-    if not plan_raw:
+def _split_credit_units(val) -> Tuple[int, int]:
+    """Lecture and lab units of a credit_units value such as "3" or "2/1"."""
+    s = str(val if val is not None else "").strip()
+    try:
+        if "/" in s:
+            parts = [int(p) for p in s.split("/") if p.strip()]
+            return (parts[0], sum(parts[1:])) if parts else (0, 0)
+        return (int(float(s)), 0) if s else (0, 0)
+    except (ValueError, OverflowError):
+        return 0, 0
+
+
+_HOURS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:hours?|hrs?|h)\b")
+_MINUTES_RE = re.compile(r"(\d+)\s*(?:minutes?|mins?|m)\b")
+
+
+def _contact_minutes(val) -> int:
+    """Minutes per week from free text such as "2 hours 40 minutes"; a bare number is hours."""
+    s = str(val if val is not None else "").strip().lower()
+    if not s:
+        return 0
+    hours = sum(float(h) for h in _HOURS_RE.findall(s))
+    minutes = sum(int(m) for m in _MINUTES_RE.findall(s))
+    if not hours and not minutes:
+        try:
+            hours = float(s)
+        except ValueError:
+            return 0
+    return int(round(hours * 60)) + minutes
+
+
+def _flatten_plan(plan_raw: Iterable[Dict]) -> List[Dict]:
+    rows = iter(plan_raw)
+    first = next(rows, None)
+    if first is None:
         return []
-    if "terms" not in plan_raw[0]:
-        return plan_raw
+    plan_raw = itertools.chain([first], rows)
+    if "terms" not in first:
+        return [PlanEntry.from_dict(row) for row in plan_raw]
     flat: List[Dict] = []
     for prog in plan_raw:
         pid = prog.get("program_id")
         for term in prog.get("terms") or []:
             year, semester = term.get("year_level"), term.get("term")
             for code in term.get("courses") or []:
-                flat.append({"program_id": pid, "year_level": year, "semester": semester, "course_id": code})
+                flat.append(PlanEntry.from_dict({"program_id": pid, "year_level": year, "semester": semester, "course_id": code}))
     return flat
 
 
-def _normalize_prereqs(prereqs_raw: List[Dict]) -> List[Dict]:
+def _normalize_prereqs(prereqs_raw: Iterable[Dict]) -> List[Dict]:
     out: List[Dict] = []
     for row in prereqs_raw:
         r = dict(row)
@@ -224,11 +318,60 @@ def _normalize_prereqs(prereqs_raw: List[Dict]) -> List[Dict]:
             r["course_id"] = r.get("course_code")
         if "prerequisite_course_id" not in r and "prerequisite_course_code" in r:
             r["prerequisite_course_id"] = r.get("prerequisite_course_code")
-        out.append(r)
+        out.append(Prerequisite.from_dict(r))
     return out
 
 
-def _postprocess_courses(courses: List[Dict]) -> List[Dict]:
+COURSE_FLAGS = ("lab", "diagnostic", "ge", "thesis", "pathfit", "nstp")
+DIAGNOSTIC_CODES = frozenset({"IENG", "IMAT"})
+
+
+def _course_flags(c: Dict) -> frozenset:
+    code = (c.get("course_code") or c.get("course_id") or "").strip().upper()
+    title = (c.get("course_title") or "").strip().lower()
+    lab_hours = str(c.get("laboratory_hours_per_week") or "").strip()
+    flags = set()
+    if "L/L" in code or (lab_hours and lab_hours != "0"):
+        flags.add("lab")
+    if code in DIAGNOSTIC_CODES:
+        flags.add("diagnostic")
+    if "general education" in (c.get("remarks") or "").lower():
+        flags.add("ge")
+    if code and ("thesis" in title or "research in psychology" in title):
+        flags.add("thesis")
+    if code.startswith("PATHFIT"):
+        flags.add("pathfit")
+    if code.startswith("NSTP"):
+        flags.add("nstp")
+    return frozenset(flags)
+
+
+def course_flags(c: Dict) -> frozenset:
+    """The COURSE_FLAGS set on a course; load_all() stores them on each record."""
+    flags = c.get("flags")
+    return _course_flags(c) if flags is None else flags
+
+
+class _FlagIndex(NamedTuple):
+    ids: Dict[str, frozenset]
+    rows: Dict[str, List[Dict]]
+
+
+def _build_flag_index(courses: List[Dict]) -> _FlagIndex:
+    rows: Dict[str, List[Dict]] = {flag: [] for flag in COURSE_FLAGS}
+    for c in courses:
+        for flag in course_flags(c):
+            rows[flag].append(c)
+    ids = {flag: frozenset(c.get("course_id") for c in flagged) for flag, flagged in rows.items()}
+    return _FlagIndex(ids, rows)
+
+
+def courses_with_flag(courses: List[Dict], flag: str) -> List[Dict]:
+    """Courses carrying `flag`, in catalog order."""
+    return list(_per_catalog("flags", courses, _build_flag_index).rows.get(flag, ()))
+
+
+def _postprocess_courses(courses: Iterable[Dict]) -> List[Dict]:
     out: List[Dict] = []
     for c in courses:
         row = dict(c)
@@ -239,25 +382,121 @@ def _postprocess_courses(courses: List[Dict]) -> List[Dict]:
             row["course_code"] = row.get("course_id")
         if "units" not in row:
             row["units"] = _credit_units_to_int(row.get("credit_units"))
-        out.append(row)
+        row["lecture_units"], row["lab_units"] = _split_credit_units(row.get("credit_units"))
+        row["total_units"] = _credit_units_to_int(row["units"])
+        row["lecture_minutes"] = _contact_minutes(row.get("lecture_hours_per_week"))
+        row["lab_minutes"] = _contact_minutes(row.get("laboratory_hours_per_week"))
+        row["flags"] = _course_flags(row)
+        out.append(Course.from_dict(row))
     return out
 
 
-def load_all() -> Dict:
+def _load_tables(datadir: Optional[Path] = None) -> Dict:
     return {
-        "departments": _load_json("departments.json"),
-        "programs": _load_json("programs.json"),
-        "courses": _postprocess_courses(_load_json("courses.json")),
-        "plan": _flatten_plan(_load_json("curriculum_plan.json")),
-        "prereqs": _normalize_prereqs(_load_json("prerequisites.json")),
-        "faculty": _load_json("faculty.json"),
+        "departments": [Department.from_dict(row) for row in _stream_json("departments.json", datadir)],
+        "programs": [Program.from_dict(row) for row in _stream_json("programs.json", datadir)],
+        "courses": _postprocess_courses(_stream_json("courses.json", datadir)),
+        "plan": _flatten_plan(_stream_json("curriculum_plan.json", datadir)),
+        "prereqs": _normalize_prereqs(_stream_json("prerequisites.json", datadir)),
+        "faculty": _load_json("faculty.json", datadir),
     }
 
 
+def catalog_files(datadir: Optional[Path] = None) -> List[Path]:
+    """The files a college's compiled NLU cache depends on: its catalog and the aliases."""
+    return sorted((datadir or DATADIR).glob("*.json")) + [ALIASES_PATH]
+
+
+def _source_key(datadir: Optional[Path] = None) -> str:
+    digest = hashlib.sha256()
+    for name in CATALOG_FILES:
+        digest.update(name.encode())
+        with open((datadir or DATADIR) / name, "rb") as f:
+            for block in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _sqlite_path(datadir: Optional[Path] = None) -> Path:
+    if datadir is None or Path(datadir) == DATADIR:
+        return SQLITE_PATH
+    return SQLITE_PATH.with_name(f"{SQLITE_PATH.stem}-{Path(datadir).name}{SQLITE_PATH.suffix}")
+
+
+def _load_sqlite(path: Optional[Path] = None, datadir: Optional[Path] = None) -> Dict:
+    """Catalog tables served from SQLite, rebuilding the file when the JSON changed."""
+    path = path or _sqlite_path(datadir)
+    key = _source_key(datadir)
+    if source_key_of(path) != key:
+        build_database(_load_tables(datadir), path, key)
+    return dict(open_catalog(path, key).tables)
+
+
+# Table ids of the last catalog loaded from each directory, whose indexes a
+# reload drops.
+_loaded: Dict[Path, frozenset] = {}
+
+
+def load_all(backend: Optional[str] = None, datadir: Optional[Path] = None) -> Dict:
+    """Load the catalog of one college, the default one unless `datadir` is given.
+
+    `backend` is "memory" (records parsed from the JSON files) or "sqlite"
+    (a read-only database built from them); it defaults to CASMATE_BACKEND.
+    """
+    global _catalog_version
+    datadir = Path(datadir or DATADIR).resolve()
+    backend = backend or BACKEND
+    if backend == "memory":
+        data = _load_tables(datadir)
+    elif backend == "sqlite":
+        data = _load_sqlite(datadir=datadir)
+    else:
+        raise ValueError(f"Unknown catalog backend: {backend}")
+    tables = _table_ids(data)
+    if _loaded.get(datadir, tables) != tables:
+        _drop_tables(_loaded[datadir])
+    _loaded[datadir] = tables
+    _catalog_version += 1
+    with _choice_lock:
+        _rosters[id(data["departments"])] = (data["departments"], data["faculty"])
+    _directory(data["departments"])
+    data["catalog_version"] = _catalog_version
+    return data
+
+
+def build_indexes(data: Dict) -> None:
+    """Build every per-catalog lookup index now rather than on first use.
+
+    prefork.py calls this before forking so the workers share the indexes.
+    """
+    courses, plan = data["courses"], data["plan"]
+    _per_catalog("titles", courses, _build_title_choices)
+    _per_catalog("code_index", courses, _build_code_index)
+    _per_catalog("match", courses, _build_course_match_index)
+    _per_catalog("flags", courses, _build_flag_index)
+    _per_catalog("programs", data["programs"], _build_program_choices)
+    _course_typos(courses)
+    _program_typos(data["programs"])
+    _department_typos(data["departments"])
+    _directory(data["departments"], data["faculty"])
+    if _sqlite_catalog(plan, courses) is None:
+        _per_catalog("title_words", courses, _build_title_words)
+        _plan_join(plan, courses)
+
+
+def _sqlite_catalog(*tables) -> Optional[SQLiteCatalog]:
+    """The SQLite catalog every one of `tables` is read from, if there is one."""
+    catalogs = {id(t.catalog) if isinstance(t, SQLiteTable) else None for t in tables}
+    return tables[0].catalog if len(catalogs) == 1 and None not in catalogs else None
+
+
 def find_course_by_code(courses: List[Dict], code: str) -> Optional[Dict]:
     if not code:
         return None
     norm = (code or "").strip().upper().replace(" ", "").replace("-", "")
+    catalog = _sqlite_catalog(courses)
+    if catalog:
+        return catalog.course_by_code(norm)
     for c in courses:
         ccode = (c.get("course_code") or "").strip().upper().replace(" ", "").replace("-", "")
         if ccode == norm:
@@ -265,21 +504,136 @@ def find_course_by_code(courses: List[Dict], code: str) -> Optional[Dict]:
     return None
 
 
-def fuzzy_best_course_title(
-    courses: List[Dict], query: str, score_cutoff: int = 80
-) -> Optional[Tuple[str, int, Dict]]:
-    if not query:
-        return None
-    choices = {c["course_title"]: c for c in courses if c.get("course_title")}
-    if not choices:
+class _Choices(NamedTuple):
+    """rapidfuzz choices with each key already run through default_process."""
+    keys: List[str]
+    processed: List[str]
+    values: List[Dict]
+
+
+def _choices(mapping: Dict[str, Dict]) -> _Choices:
+    keys = list(mapping)
+    return _Choices(keys, [utils.default_process(k) for k in keys], [mapping[k] for k in keys])
+
+
+# Several catalogs (one per loaded college) can be live at once, so each
+# index keeps a few slots, keyed on the identity of the list it was built from.
+CATALOG_SLOTS = 16
+_choice_cache: Dict[str, "OrderedDict[int, Tuple[Tuple[List[Dict], ...], Tuple[int, ...], object]]"] = {}
+_choice_lock = threading.Lock()
+# The faculty roster loaded with each departments list, keyed on its id; the
+# leadership helpers are only handed the departments.
+_rosters: Dict[int, Tuple[List[Dict], Sequence[Dict]]] = {}
+
+
+def _per_catalog(name: str, rows: List[Dict], build: Callable[[List[Dict]], T], *deps: List[Dict]) -> T:
+    """Memoize build(rows) for as long as the catalog hands us the same list.
+
+    `deps` are other lists the result was built from; a new one rebuilds it.
+    """
+    lists = (rows,) + deps
+    with _choice_lock:
+        slots = _choice_cache.setdefault(name, OrderedDict())
+        cached = slots.get(id(rows))
+        if cached is not None and all(a is b for a, b in zip(cached[0], lists)) and cached[1] == tuple(map(len, lists)):
+            slots.move_to_end(id(rows))
+            return cached[2]
+    value = build(rows)
+    with _choice_lock:
+        slots[id(rows)] = (lists, tuple(map(len, lists)), value)
+        slots.move_to_end(id(rows))
+        while len(slots) > CATALOG_SLOTS:
+            slots.popitem(last=False)
+    return value
+
+
+def _table_ids(data: Dict) -> frozenset:
+    return frozenset(id(rows) for rows in data.values() if isinstance(rows, Sequence) and not isinstance(rows, str))
+
+
+def _drop_tables(tables: frozenset) -> None:
+    # find_course_any keys carry id(courses) second.
+    _course_match_memo.discard(lambda key: key[1] in tables)
+    # A slot holds on to its lists, so an id in a live slot is never reused.
+    with _choice_lock:
+        for key in [k for k in _rosters if k in tables]:
+            del _rosters[key]
+        for slots in _choice_cache.values():
+            for key in [k for k, (lists, _, _) in slots.items() if any(id(rows) in tables for rows in lists)]:
+                del slots[key]
+
+
+def drop_catalog(data: Dict) -> None:
+    """Forget every index built from the tables of `data`."""
+    _drop_tables(_table_ids(data))
+
+
+def _build_title_choices(courses: List[Dict]) -> Tuple[_Choices, TrigramIndex]:
+    titles = _choices({c["course_title"]: c for c in courses if c.get("course_title")})
+    return titles, TrigramIndex(titles.processed)
+
+
+def _title_candidates(courses: List[Dict], queries: List[str]) -> Tuple[_Choices, List[int]]:
+    """Positions of titles sharing a trigram with any of `queries`, or all of them."""
+    titles, index = _per_catalog("titles", courses, _build_title_choices)
+    ids = set()
+    for q in queries:
+        ids.update(index.candidates(utils.default_process(q)))
+    return titles, sorted(ids) if ids else list(range(len(titles.keys)))
+
+
+def _score_matrix(queries: List[str], processed: List[str], scorer) -> np.ndarray:
+    """One native pass scoring every query against pre-processed choices."""
+    return process.cdist(
+        [utils.default_process(q) for q in queries], processed,
+        scorer=scorer, processor=None, dtype=np.float64, workers=-1,
+    )
+
+
+def _best_index(row: np.ndarray, score_cutoff: int) -> Optional[int]:
+    # argmax returns the first maximum, matching extractOne's tie-breaking.
+    if not len(row):
         return None
+    i = int(row.argmax())
+    return i if row[i] >= score_cutoff else None
+
+
+def _extract_titles(
+    courses: List[Dict], query: str, scorer, score_cutoff: int, limit: Optional[int] = 1
+) -> List[Tuple[str, int, Dict]]:
+    """Score course titles against `query`, best first.
+
+    Only titles sharing a trigram with the query are scored; when none do,
+    every title is. Candidates keep catalog order so ties break as before.
+    """
+    titles, ids = _title_candidates(courses, [query])
+    processed = [titles.processed[i] for i in ids]
+    q = utils.default_process(query)
+    if limit == 1:
+        best = process.extractOne(q, processed, scorer=scorer, score_cutoff=score_cutoff, processor=None)
+        results = [best] if best else []
+    else:
+        results = process.extract(q, processed, scorer=scorer, limit=limit, score_cutoff=score_cutoff, processor=None)
+    return [(titles.keys[ids[i]], score, titles.values[ids[i]]) for _, score, i in results]
+
+
+def _extract_one(choices: _Choices, query: str, scorer, score_cutoff: int) -> Optional[Tuple[str, int, Dict]]:
     result = process.extractOne(
-        query, choices.keys(), scorer=fuzz.token_set_ratio, score_cutoff=score_cutoff, processor=utils.default_process
+        utils.default_process(query), choices.processed, scorer=scorer, score_cutoff=score_cutoff, processor=None
     )
     if not result:
         return None
-    match, score, _ = result
-    return match, score, choices[match]
+    _, score, i = result
+    return choices.keys[i], score, choices.values[i]
+
+
+def fuzzy_best_course_title(
+    courses: List[Dict], query: str, score_cutoff: int = 80
+) -> Optional[Tuple[str, int, Dict]]:
+    if not query:
+        return None
+    hits = _extract_titles(courses, query, fuzz.token_set_ratio, score_cutoff)
+    return hits[0] if hits else None
 
 
 def fuzzy_top_course_titles(
@@ -290,119 +644,314 @@ def fuzzy_top_course_titles(
     clean_q = _clean_course_query(query)
     if not clean_q:
         clean_q = query
-    choices = {c["course_title"]: c for c in courses if c.get("course_title")}
-    if not choices:
+    return _extract_titles(courses, clean_q, fuzz.token_set_ratio, score_cutoff, limit=limit)
+
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def _title_words(text: str) -> List[str]:
+    # Split like SQLite's unicode61 tokenizer: case and diacritics folded,
+    # anything that is not a letter or digit separates words.
+    folded = "".join(ch for ch in unicodedata.normalize("NFKD", text or "") if not unicodedata.combining(ch))
+    return _WORD_RE.findall(folded.lower())
+
+
+def _build_title_words(courses: List[Dict]) -> List[Tuple[int, List[str], Dict]]:
+    return [
+        (len(c.get("course_title") or ""), _title_words(c.get("course_title")) + _title_words(c.get("course_code")), c)
+        for c in courses
+    ]
+
+
+def search_course_titles(courses: List[Dict], query: str, limit: int = 10) -> List[Dict]:
+    """Courses with a title or code word starting with every word of the query.
+
+    Shortest titles come first. A SQLite catalog answers from its FTS5 table.
+    """
+    words = _title_words(_clean_course_query(query))
+    if not words:
         return []
-    results = process.extract(
-        clean_q, choices.keys(), scorer=fuzz.token_set_ratio, limit=limit, score_cutoff=score_cutoff, processor=utils.default_process
+    catalog = _sqlite_catalog(courses)
+    if catalog:
+        return catalog.search_titles(words, limit)
+    rows = _per_catalog("title_words", courses, _build_title_words)
+    hits = [
+        (length, i, c) for i, (length, title_words, c) in enumerate(rows)
+        if all(any(t.startswith(w) for t in title_words) for w in words)
+    ]
+    return [c for _, _, c in sorted(hits, key=lambda h: h[:2])[:limit]]
+
+
+def _vocabulary(phrases: Iterable[str]) -> List[str]:
+    # Both the plain and the singularized forms, since queries reach the
+    # index in either shape (e.g. after COURSE_TERM_SYNONYMS).
+    words: List[str] = []
+    for p in phrases:
+        words += _PUNCT.sub(" ", p.lower()).split()
+        words += _normalize_phrase_uncached(p).split()
+    return words
+
+
+def _course_typos(courses: List[Dict]) -> DeletionIndex:
+    return _per_catalog(
+        "course_typos", courses,
+        lambda rows: DeletionIndex(
+            _vocabulary([c.get("course_title") or "" for c in rows] + ALIASES.aliases("course")), TYPO_MAX_EDIT_DISTANCE
+        ),
     )
-    return [(m, s, choices[m]) for m, s, _ in results]
 
 
-def find_course_any(data: Dict, text: str) -> Tuple[Optional[Dict], str]:
-    courses = data.get("courses", [])
-    if not text or not courses:
-        return None, "none"
+def _program_typos(programs: List[Dict]) -> DeletionIndex:
+    return _per_catalog(
+        "program_typos", programs,
+        lambda rows: DeletionIndex(
+            _vocabulary([p.get(k) or "" for p in rows for k in ("program_name", "short_name")] + ALIASES.aliases("program")),
+            TYPO_MAX_EDIT_DISTANCE,
+        ),
+    )
 
-    clean_for_alias = _clean_course_query(text)
-    if clean_for_alias and clean_for_alias.lower() in COURSE_ALIASES:
-        target = COURSE_ALIASES[clean_for_alias.lower()]
-        for c in courses:
-            if c.get("course_title", "").lower() == target.lower():
-                return c, "alias"
+
+def _department_typos(departments: List[Dict]) -> DeletionIndex:
+    return _per_catalog(
+        "department_typos", departments,
+        lambda rows: DeletionIndex(
+            _vocabulary([d.get("department_name") or "" for d in rows] + ALIASES.aliases("department")), TYPO_MAX_EDIT_DISTANCE
+        ),
+    )
+
+
+def typo_index_stats(data: Dict) -> Dict[str, Dict[str, int]]:
+    """Vocabulary size and approximate memory of each typo index."""
+    indexes = {
+        "courses": _course_typos(data.get("courses", [])),
+        "programs": _program_typos(data.get("programs", [])),
+        "departments": _department_typos(data.get("departments", [])),
+    }
+    return {name: {"words": len(ix), "bytes": ix.memory_bytes()} for name, ix in indexes.items()}
+
+
+class _CourseMatchIndex(NamedTuple):
+    """Per-catalog lookups for the exact stages of find_course_any."""
+    # The decoded courses, so the stages never iterate an SQLite table.
+    rows: List[Dict]
+    by_title_lower: Dict[str, Dict]
+    title_positions: Dict[str, int]
+    title_tokens: List[frozenset]
+    codes: List[str]
+    code_patterns: List[Optional["re.Pattern"]]
+
+
+def _build_course_match_index(courses: List[Dict]) -> _CourseMatchIndex:
+    by_title_lower: Dict[str, Dict] = {}
+    title_positions: Dict[str, int] = {}
+    title_tokens: List[frozenset] = []
+    codes: List[str] = []
+    code_patterns: List[Optional["re.Pattern"]] = []
+    rows = list(courses)
+    for i, c in enumerate(rows):
+        title = c.get("course_title", "")
+        by_title_lower.setdefault(title.lower(), c)
+        t_norm = _normalize_phrase_uncached(title)
+        title_positions.setdefault(t_norm, i)
+        title_tokens.append(frozenset(t_norm.split()))
+        codes.append((c.get("course_code") or "").strip().upper().replace(" ", "").replace("-", ""))
+        code = (c.get("course_code") or c.get("course_id") or "").strip().upper()
+        if code:
+            parts = [re.escape(p) for p in code.split()]
+            code_patterns.append(re.compile(r"\b" + r"[\s-]*".join(parts) + r"\b"))
+        else:
+            code_patterns.append(None)
+    return _CourseMatchIndex(rows, by_title_lower, title_positions, title_tokens, codes, code_patterns)
+
+
+def _match_course_exact(
+    index: _CourseMatchIndex, text: str, clean_for_alias: str
+) -> Optional[Tuple[Dict, str, float]]:
+    """The alias, code and exact-title stages of find_course_any."""
+    target = ALIASES.resolve("course", clean_for_alias) if clean_for_alias else None
+    if target:
+        c = index.by_title_lower.get(target.lower())
+        if c is not None:
+            return c, "alias", 100.0
 
     text_upper = (text or "").upper()
     m = CODE_RE.search(text_upper)
     if m:
         extracted = f"{m.group(1)}{m.group(2)}"
-        for c in courses:
-            ccode = (c.get("course_code") or "").strip().upper().replace(" ", "").replace("-", "")
-            if ccode == extracted:
-                return c, "code"
+        for c, ccode in zip(index.rows, index.codes):
             if ccode.startswith(extracted):
-                return c, "code"
+                return c, "code", 100.0
         if extracted.startswith("CS"):
             alt_extracted = "CC" + extracted[2:]
-            for c in courses:
-                ccode = (c.get("course_code") or "").strip().upper().replace(" ", "").replace("-", "")
+            for c, ccode in zip(index.rows, index.codes):
                 if ccode.startswith(alt_extracted):
-                    return c, "fuzzy_code"
+                    return c, "fuzzy_code", 100.0
 
     text_norm = _normalize_phrase(text)
     clean_text_norm = _normalize_phrase(clean_for_alias)
-    
-    exact_matches = []
-    for c in courses:
-        title = c.get("course_title", "")
-        t_norm = _normalize_phrase(title)
-        if t_norm == text_norm or t_norm == clean_text_norm:
-            exact_matches.append(c)
-    
-    if exact_matches:
-        return exact_matches[0], "exact_title"
+    exact = [index.title_positions[n] for n in (text_norm, clean_text_norm) if n in index.title_positions]
+    if exact:
+        return index.rows[min(exact)], "exact_title", 100.0
 
     text_tokens = set(clean_text_norm.split())
     if len(text_tokens) >= 1:
         best_candidate = None
         best_overlap_ratio = 0.0
-        
-        for c in courses:
-            title = c.get("course_title", "")
-            title_norm = _normalize_phrase(title)
-            title_tokens = set(title_norm.split())
+        for c, title_tokens in zip(index.rows, index.title_tokens):
             if not title_tokens: continue
-            
-            intersection = text_tokens.intersection(title_tokens)
-            
-            if len(intersection) == len(text_tokens):
-                ratio = len(intersection) / len(title_tokens)
+            if text_tokens <= title_tokens:
+                ratio = len(text_tokens) / len(title_tokens)
                 if ratio > best_overlap_ratio:
                     best_overlap_ratio = ratio
                     best_candidate = c
-        
         if best_candidate and best_overlap_ratio >= 0.8:
-             return best_candidate, "exact_title_subset"
+            return best_candidate, "exact_title_subset", best_overlap_ratio * 100
 
-    for c in courses:
-        code = (c.get("course_code") or c.get("course_id") or "").strip().upper()
-        if not code:
-            continue
-        parts = [re.escape(p) for p in code.split()]
-        pat = r"\b" + r"[\s-]*".join(parts) + r"\b"
-        if re.search(pat, text_upper):
-            return c, "code"
-
-    text_nospace = text.replace(" ", "")
-    code_choices = {c.get("course_code"): c for c in courses if c.get("course_code")}
-    code_result = process.extractOne(text, code_choices.keys(), scorer=fuzz.ratio, score_cutoff=65, processor=utils.default_process)
-    if not code_result:
-        code_result = process.extractOne(text_nospace, code_choices.keys(), scorer=fuzz.ratio, score_cutoff=65, processor=utils.default_process)
-
-    if code_result:
-        match_code, score, _ = code_result
+    for c, pat in zip(index.rows, index.code_patterns):
+        if pat is not None and pat.search(text_upper):
+            return c, "code", 100.0
+    return None
+
+
+def _build_code_index(courses: List[Dict]) -> Tuple[_Choices, PivotIndex, np.ndarray]:
+    codes = _choices({c.get("course_code"): c for c in courses if c.get("course_code")})
+    lengths = np.array([len(p) for p in codes.processed], dtype=np.int16)
+    return codes, PivotIndex(codes.processed), lengths
+
+
+def _best_code(courses: List[Dict], query: str, score_cutoff: int) -> Optional[Tuple[Dict, float]]:
+    """The course whose code has the best fuzz.ratio with `query`, if any reaches the cutoff."""
+    codes, index, lengths = _per_catalog("code_index", courses, _build_code_index)
+    q = utils.default_process(query)
+    # fuzz.ratio is 100 * (1 - indel / (len(q) + len(code))), so reaching
+    # the cutoff needs an Indel distance within this bound for each code.
+    bounds = (100 - score_cutoff) * (len(q) + lengths) // 100
+    ids = index.candidates(q, bounds)
+    if not len(ids):
+        return None
+    best = process.extractOne(q, index.strings[ids], scorer=fuzz.ratio, score_cutoff=score_cutoff, processor=None)
+    if not best:
+        return None
+    return codes.values[ids[best[2]]], best[1]
+
+
+def _match_courses_fuzzy(
+    courses: List[Dict], pending: List[Tuple[int, str, str]], results: List[Tuple[Optional[Dict], str, float]]
+) -> None:
+    """The fuzzy stages of find_course_any for every pending query at once.
+
+    Each title scorer makes one cdist call over all pending queries and the
+    titles any of them shares a trigram with; the stage order and cutoffs then pick the winner from each query's rows.
+    Course codes are searched through a pivot-table metric index instead.
+    """
+    titles, _ = _per_catalog("titles", courses, _build_title_choices)
+
+    sort_queries: List[str] = []
+    set_queries: List[str] = []
+    plans = []
+    for pos, text, clean_for_alias in pending:
+        target_for_ratio = clean_for_alias if clean_for_alias else text
+        variants = [text, clean_for_alias] if clean_for_alias and clean_for_alias != text else [text]
+        sort_row = None
+        if len(target_for_ratio) > 5:
+            sort_row = len(sort_queries)
+            sort_queries.append(target_for_ratio)
+        set_rows = range(len(set_queries), len(set_queries) + len(variants))
+        set_queries += variants
+        _, ids = _title_candidates(courses, [target_for_ratio] + variants)
+        plans.append((pos, text, sort_row, set_rows, ids))
+
+    # Only titles sharing a trigram with some pending query are scored, as
+    # in fuzzy_best_course_title; columns keep catalog order so ties break
+    # the same way.
+    columns = np.array(sorted(set().union(*(plan[4] for plan in plans))), dtype=np.intp)
+    processed = [titles.processed[i] for i in columns]
+    sort_scores = _score_matrix(sort_queries, processed, fuzz.token_sort_ratio) if sort_queries else None
+    set_scores = _score_matrix(set_queries, processed, fuzz.token_set_ratio)
+
+    for pos, text, sort_row, set_rows, ids in plans:
+        # Code matches are only used when the text has a digit.
         if any(char.isdigit() for char in text):
-            return code_choices[match_code], "fuzzy_code"
-
-    target_for_ratio = clean_for_alias if clean_for_alias else text
-    choices_titles = {c["course_title"]: c for c in courses if c.get("course_title")}
-    if choices_titles:
-        strict_match = process.extractOne(
-            target_for_ratio, choices_titles.keys(), scorer=fuzz.token_sort_ratio, score_cutoff=85, processor=utils.default_process
-        )
-        if strict_match:
-            match_title, score, _ = strict_match
-            if len(target_for_ratio) > 5:
-                return choices_titles[match_title], "high_confidence_fuzzy"
-
-    fb = fuzzy_best_course_title(courses, text, score_cutoff=88)
-    if fb:
-        return fb[2], "fuzzy"
-    if clean_for_alias and clean_for_alias != text:
-        fb = fuzzy_best_course_title(courses, clean_for_alias, score_cutoff=88)
-        if fb:
-            return fb[2], "fuzzy"
-
-    return None, "none"
+            hit = _best_code(courses, text, 65) or _best_code(courses, text.replace(" ", ""), 65)
+            if hit is not None:
+                results[pos] = (hit[0], "fuzzy_code", hit[1])
+                continue
+        # Of those, only this query's own candidates compete.
+        mask = np.zeros(len(columns), dtype=bool)
+        mask[np.searchsorted(columns, ids)] = True
+        if sort_row is not None:
+            hit = _first_over(sort_scores, (sort_row,), mask, 85)
+            if hit is not None:
+                results[pos] = (titles.values[columns[hit[0]]], "high_confidence_fuzzy", hit[1])
+                continue
+        hit = _first_over(set_scores, set_rows, mask, 88)
+        if hit is not None:
+            results[pos] = (titles.values[columns[hit[0]]], "fuzzy", hit[1])
+
+
+def _first_over(scores: np.ndarray, rows, mask: np.ndarray, score_cutoff: int) -> Optional[Tuple[int, float]]:
+    for r in rows:
+        row = np.where(mask, scores[r], -1.0)
+        i = _best_index(row, score_cutoff)
+        if i is not None:
+            return i, float(row[i])
+    return None
+
+
+def find_courses_bulk(data: Dict, texts: Iterable[str]) -> List[Tuple[Optional[Dict], str, float]]:
+    """Resolve many course queries at once, as find_course_any would.
+
+    Returns (course, match_type, score) per input; score is 100 for alias,
+    code and exact-title hits, the overlap percentage for title subsets, the
+    rapidfuzz score for fuzzy hits, and 0 when nothing matched.
+    """
+    courses = data.get("courses", [])
+    texts = list(texts)
+    results: List[Tuple[Optional[Dict], str, float]] = [(None, "none", 0.0)] * len(texts)
+    if not courses:
+        return results
+    index = _per_catalog("match", courses, _build_course_match_index)
+    pending: List[Tuple[int, str, str]] = []
+    for pos, text in enumerate(texts):
+        if not text:
+            continue
+        clean_for_alias = _clean_course_query(text)
+        hit = _match_course_exact(index, text, clean_for_alias)
+        if not hit and clean_for_alias:
+            # Give misspelled titles a second, cheap shot at the exact
+            # stages before they fall through to fuzzy scoring.
+            corrected = _course_typos(courses).correct(clean_for_alias, TYPO_MAX_EDIT_DISTANCE)
+            if corrected != clean_for_alias:
+                hit = _match_course_exact(index, corrected, _clean_course_query(corrected))
+                if hit and hit[1] not in ("alias", "exact_title", "exact_title_subset"):
+                    hit = None
+                clean_for_alias = corrected
+        if hit:
+            results[pos] = hit
+        else:
+            pending.append((pos, text, clean_for_alias))
+    # Bound the score matrices on very long inputs.
+    for start in range(0, len(pending), BULK_CHUNK_SIZE):
+        _match_courses_fuzzy(courses, pending[start:start + BULK_CHUNK_SIZE], results)
+    return results
+
+
+def find_course_any(data: Dict, text: str) -> Tuple[Optional[Dict], str]:
+    version = data.get("catalog_version")
+    if version is None:
+        return _find_course_any_uncached(data, text)
+    # Keyed on the courses list as well, so a copy of the catalog with other
+    # courses (dict(data, courses=...)) never reuses these entries, and on
+    # the typo distance, which changes what a misspelled title resolves to.
+    key = (version, id(data.get("courses")), TYPO_MAX_EDIT_DISTANCE, text)
+    return _course_match_memo.get(key, lambda: _find_course_any_uncached(data, text))
+
+
+def _find_course_any_uncached(data: Dict, text: str) -> Tuple[Optional[Dict], str]:
+    course, match_type, _ = find_courses_bulk(data, [text])[0]
+    return course, match_type
+
 
 def fuzzy_best_program(
     programs: List[Dict], query: str, score_cutoff: int = 70
@@ -410,18 +959,9 @@ def fuzzy_best_program(
     if not query:
         return None
     raw = (query or "").strip()
-    raw_upper = raw.upper()
-    raw_tokens = [t for t in re.split(r"\s+", raw_upper) if t]
-    abbrev_candidates = []
-    for tok in raw_tokens:
-        if tok in PROGRAM_ABBREV:
-            abbrev_candidates.append(tok)
-    if raw_upper in PROGRAM_ABBREV and raw_upper not in abbrev_candidates:
-        abbrev_candidates.append(raw_upper)
-
-    if abbrev_candidates:
-        key = abbrev_candidates[0]
-        target_full = PROGRAM_ABBREV[key].upper()
+    hit = ALIASES.first(raw, "program")
+    if hit:
+        target_full = hit.target.upper()
         for p in programs:
             pname = (p.get("program_name") or "").strip().upper()
             sname = (p.get("short_name") or "").strip().upper()
@@ -430,6 +970,15 @@ def fuzzy_best_program(
 
     cleaned = _clean_program_query(query)
     use_query = cleaned or query
+    if cleaned:
+        use_query = _program_typos(programs).correct(cleaned, TYPO_MAX_EDIT_DISTANCE)
+    choices = _per_catalog("programs", programs, _build_program_choices)
+    if not choices.keys:
+        return None
+    return _extract_one(choices, use_query, fuzz.WRatio, score_cutoff)
+
+
+def _build_program_choices(programs: List[Dict]) -> _Choices:
     choices = {}
     for p in programs:
         name = p.get("program_name") or ""
@@ -438,24 +987,21 @@ def fuzzy_best_program(
         sname = p.get("short_name") or ""
         if sname:
             choices[sname] = p
-    for abbrev, full_name in PROGRAM_ABBREV.items():
+    for abbrev, full_name in ALIASES.table("program").items():
         full_up = full_name.upper()
         for p in programs:
             pname = (p.get("program_name") or "").strip().upper()
             sname = (p.get("short_name") or "").strip().upper()
             if pname == full_up or sname == full_up or full_up in pname:
                 choices[abbrev] = p; break
-    if not choices:
-        return None
-    result = process.extractOne(use_query, list(choices.keys()), scorer=fuzz.WRatio, score_cutoff=score_cutoff, processor=utils.default_process)
-    if not result:
-        return None
-    match, score, _ = result
-    return match, score, choices[match]
+    return _choices(choices)
 
 
 def get_prerequisites(prereqs: List[Dict], courses: List[Dict], course_id: str) -> List[Dict]:
     if not course_id: return []
+    catalog = _sqlite_catalog(prereqs, courses)
+    if catalog:
+        return catalog.prerequisites(course_id)
     needed = []
     seen = set()
     by_id = {c.get("course_id"): c for c in courses if c.get("course_id")}
@@ -484,67 +1030,193 @@ def get_program_head(programs: List[Dict], departments: List[Dict], query: str)
     if not dept_id:
         return (pname, None)
 
-    head_name = None
-    for d in departments:
-        if d.get("department_id") == dept_id:
-            head_name = d.get("department_head")
-            break
-    return (pname, head_name)
+    directory = _directory(departments)
+    d = directory.by_id.get(dept_id)
+    return (pname, directory.head_of(d) if d else None)
 
-def courses_for_plan(plan, courses, program_id, year, semester):
-    rows = []
-    by_id = {c.get("course_id"): c for c in courses if c.get("course_id")}
-    for entry in plan:
-        if (entry.get("program_id") == program_id and str(entry.get("year_level")) == str(year) and str(entry.get("semester")) == str(semester)):
-            cid = entry.get("course_id")
-            course = by_id.get(cid)
-            if course: rows.append(course)
-    return rows
+class _PlanColumns(NamedTuple):
+    """The flattened plan as integer-coded columns, one element per plan row."""
+    program_ids: List[str]
+    program_codes: Dict[str, int]
+    program: np.ndarray
+    year: np.ndarray
+    term: np.ndarray
+    course_ids: List[str]
+    course: np.ndarray
+
+
+def _plan_int(value, invalid: int = -1) -> int:
+    """A plan year or term as an int, or `invalid` unless it reads back unchanged."""
+    try:
+        n = int(str(value))
+    except ValueError:
+        return invalid
+    return n if str(n) == str(value) else invalid
+
+
+def _build_plan_columns(plan: List[Dict]) -> _PlanColumns:
+    program_codes: Dict[str, int] = {}
+    course_codes: Dict[str, int] = {}
+    n = len(plan)
+    program = np.empty(n, dtype=np.int32)
+    year = np.empty(n, dtype=np.int32)
+    term = np.empty(n, dtype=np.int32)
+    course = np.empty(n, dtype=np.int32)
+    for i, entry in enumerate(plan):
+        program[i] = program_codes.setdefault(entry.get("program_id"), len(program_codes))
+        year[i] = _plan_int(entry.get("year_level"))
+        term[i] = _plan_int(entry.get("semester"))
+        course[i] = course_codes.setdefault(entry.get("course_id"), len(course_codes))
+    return _PlanColumns(list(program_codes), program_codes, program, year, term, list(course_codes), course)
+
+
+class _PlanJoin(NamedTuple):
+    """Plan columns joined to a course list: row -> course position, units and flags."""
+    cols: _PlanColumns
+    rows: List[Dict]
+    course: np.ndarray
+    units: np.ndarray
+    diagnostic: np.ndarray
+    flagged: Dict[str, np.ndarray]
+
+
+def _build_plan_join(plan: List[Dict], courses: List[Dict]) -> _PlanJoin:
+    cols = _per_catalog("plan_columns", plan, _build_plan_columns)
+    position: Dict[str, int] = {}
+    for i, c in enumerate(courses):
+        if c.get("course_id"):
+            position.setdefault(c.get("course_id"), i)
+    vocab = np.array([position.get(cid, -1) for cid in cols.course_ids] + [-1], dtype=np.int32)
+    course = vocab[cols.course] if len(cols.course) else np.empty(0, dtype=np.int32)
+    units = np.array([_total_units(c) for c in courses] + [0], dtype=np.int64)
+    flags = [course_flags(c) for c in courses] + [frozenset()]
+    flagged = {flag: np.array([flag in f for f in flags], dtype=bool) for flag in COURSE_FLAGS}
+    return _PlanJoin(cols, list(courses), course, units, flagged["diagnostic"], flagged)
+
+
+def _plan_join(plan: List[Dict], courses: List[Dict]) -> _PlanJoin:
+    return _per_catalog("plan_join", plan, lambda rows: _build_plan_join(rows, courses), courses)
+
+
+def _plan_mask(join: _PlanJoin, program_id, year, semester=None) -> np.ndarray:
+    """Plan rows of one program and year (and term) whose course is in the catalog."""
+    cols = join.cols
+    code = cols.program_codes.get(program_id)
+    if code is None:
+        return np.zeros(len(cols.program), dtype=bool)
+    # Arguments that are not plain ints code as -2 so they match no row,
+    # not even the -1 rows whose own year or term failed to parse.
+    mask = (cols.program == code) & (join.course >= 0) & (cols.year == _plan_int(year, -2))
+    if semester is not None:
+        mask &= cols.term == _plan_int(semester, -2)
+    return mask
+
+
+def courses_for_plan(plan, courses, program_id, year, semester, flag=None):
+    catalog = _sqlite_catalog(plan, courses)
+    if catalog:
+        return catalog.plan_courses(program_id, _plan_int(year, -2), _plan_int(semester, -2), flag)
+    join = _plan_join(plan, courses)
+    mask = _plan_mask(join, program_id, year, -2 if semester is None else semester)
+    if flag:
+        mask &= join.flagged.get(flag, np.zeros(len(join.units), dtype=bool))[join.course]
+    return [join.rows[i] for i in join.course[mask]]
+
+def plan_years(plan, courses, program_id) -> List[int]:
+    """Sorted year levels that have plan rows for a program."""
+    catalog = _sqlite_catalog(plan, courses)
+    if catalog:
+        return catalog.plan_years(program_id)
+    join = _plan_join(plan, courses)
+    code = join.cols.program_codes.get(program_id)
+    if code is None:
+        return []
+    years = join.cols.year[join.cols.program == code]
+    return [int(y) for y in np.unique(years[years >= 0])]
+
+def _total_units(c: Dict) -> int:
+    return c["total_units"] if "total_units" in c else _credit_units_to_int(c.get("units"))
+
+def contact_minutes_for_term(plan, courses, program_id, year, semester, exclude_diagnostic: bool = False) -> Dict[str, int]:
+    """Weekly lecture, lab and total contact minutes of one plan slice."""
+    rows = courses_for_plan(plan, courses, program_id, year, semester)
+    if exclude_diagnostic:
+        rows = [c for c in rows if "diagnostic" not in course_flags(c)]
+    lecture = sum(c.get("lecture_minutes") or 0 for c in rows)
+    lab = sum(c.get("lab_minutes") or 0 for c in rows)
+    return {"lecture_minutes": lecture, "lab_minutes": lab, "total_minutes": lecture + lab}
+
+def _units_by_term(join: _PlanJoin, mask: np.ndarray) -> np.ndarray:
+    """Units of the masked plan rows summed per term 0..3."""
+    terms = join.cols.term[mask]
+    keep = (terms >= 0) & (terms <= 3)
+    return np.bincount(terms[keep], weights=join.units[join.course[mask][keep]], minlength=4).astype(np.int64)
+
+def _sqlite_units_by_term(catalog: SQLiteCatalog, program_id, year, exclude_diagnostic: bool) -> Tuple[np.ndarray, set]:
+    per_term = np.zeros(4, dtype=np.int64)
+    had = set()
+    for term, total, kept, diagnostic in catalog.units_by_term(program_id, _plan_int(year, -2)):
+        if 0 <= term <= 3:
+            per_term[term] = kept if exclude_diagnostic else total
+        if diagnostic:
+            had.add(term)
+    return per_term, had
 
 def units_by_program_year(plan, courses, program_id, year):
-    by_sem = {}
-    total = 0
-    for sem in ["1", "2", "3"]:
-        sem_courses = []
-        for entry in plan:
-            if (entry.get("program_id") == program_id and str(entry.get("year_level")) == str(year) and str(entry.get("semester")) == str(sem)):
-                cid = entry.get("course_id")
-                c = next((x for x in courses if x.get("course_id") == cid), None)
-                if c: sem_courses.append(c)
-        sem_units = sum(_credit_units_to_int(c.get("units")) for c in sem_courses)
-        if sem_units > 0: by_sem[sem] = sem_units; total += sem_units
-    return total, by_sem
+    catalog = _sqlite_catalog(plan, courses)
+    if catalog:
+        per_term, _ = _sqlite_units_by_term(catalog, program_id, year, False)
+    else:
+        join = _plan_join(plan, courses)
+        per_term = _units_by_term(join, _plan_mask(join, program_id, year))
+    by_sem = {str(t): int(per_term[t]) for t in (1, 2, 3) if per_term[t] > 0}
+    return sum(by_sem.values()), by_sem
 
 def units_by_program_year_with_exclusions(plan, courses, program_id, year):
-    DIAGNOSTIC_COURSES = {"IMAT", "IENG"}
-    by_sem = {}; diagnostic_by_sem = {}; total = 0
-    for sem in ["1", "2", "3"]:
-        sem_courses = []; had_diagnostic = False
-        for entry in plan:
-            if (entry.get("program_id") == program_id and str(entry.get("year_level")) == str(year) and str(entry.get("semester")) == str(sem)):
-                cid = entry.get("course_id")
-                c = next((x for x in courses if x.get("course_id") == cid), None)
-                if c:
-                    if (c.get("course_code") or "").strip().upper() in DIAGNOSTIC_COURSES:
-                        had_diagnostic = True; continue
-                    sem_courses.append(c)
-        sem_units = sum(_credit_units_to_int(c.get("units")) for c in sem_courses)
-        if sem_units > 0: by_sem[sem] = sem_units; total += sem_units
-        diagnostic_by_sem[sem] = had_diagnostic
-    return total, by_sem, diagnostic_by_sem
+    catalog = _sqlite_catalog(plan, courses)
+    if catalog:
+        per_term, had = _sqlite_units_by_term(catalog, program_id, year, True)
+    else:
+        join = _plan_join(plan, courses)
+        mask = _plan_mask(join, program_id, year)
+        diagnostic = mask & join.diagnostic[join.course]
+        per_term = _units_by_term(join, mask & ~diagnostic)
+        had = set(join.cols.term[diagnostic].tolist())
+    by_sem = {str(t): int(per_term[t]) for t in (1, 2, 3) if per_term[t] > 0}
+    diagnostic_by_sem = {str(t): t in had for t in (1, 2, 3)}
+    return sum(by_sem.values()), by_sem, diagnostic_by_sem
+
+def units_matrix(plan, courses) -> Tuple[List[str], np.ndarray]:
+    """Units per program, year and term for the whole plan.
+
+    Returns the program ids and an int array indexed [program, year, term];
+    index 0 of the year and term axes is unused.
+    """
+    catalog = _sqlite_catalog(plan, courses)
+    if catalog:
+        program_ids, sums = catalog.units_matrix()
+        years = max((y for _, y, _, _ in sums), default=0) + 1
+        terms = max((t for _, _, t, _ in sums), default=0) + 1
+        matrix = np.zeros((len(program_ids), years, terms), dtype=np.int64)
+        for p, y, t, units in sums:
+            matrix[p, y, t] = units
+        return program_ids, matrix
+    join = _plan_join(plan, courses)
+    cols = join.cols
+    ok = (join.course >= 0) & (cols.year >= 0) & (cols.term >= 0)
+    if not ok.any():
+        return cols.program_ids, np.zeros((len(cols.program_ids), 1, 1), dtype=np.int64)
+    years, terms = int(cols.year[ok].max()) + 1, int(cols.term[ok].max()) + 1
+    flat = (cols.program[ok] * years + cols.year[ok]) * terms + cols.term[ok]
+    sums = np.bincount(flat, weights=join.units[join.course[ok]], minlength=len(cols.program_ids) * years * terms)
+    return cols.program_ids, sums.astype(np.int64).reshape(len(cols.program_ids), years, terms)
 
 def list_department_heads(departments: List[Dict]) -> List[Dict]:
-    rows = []
-    for d in departments:
-        head = d.get("department_head") or ""
-        if head:
-            rows.append({"department_id": d.get("department_id"), "department_name": d.get("department_name"), "department_head": head, "dean_flag": d.get("dean_flag") or "N"})
-    rows.sort(key=lambda r: 0 if (r.get("dean_flag") or "N").upper() == "Y" else 1)
-    return rows
+    return list(_directory(departments).heads)
 
 def get_department_head_by_name(departments: List[Dict], dept_name: str) -> Optional[str]:
     d = department_lookup(departments, dept_name)
-    return d.get("department_head") if d else None
+    return _directory(departments).head_of(d) if d else None
 
 def get_dept_role_label(dept_row: Dict, user_text: str) -> str:
     if not dept_row: return "Department head"
@@ -553,26 +1225,105 @@ def get_dept_role_label(dept_row: Dict, user_text: str) -> str:
     return "Department head"
 
 def get_cas_dean(departments: List[Dict]) -> Optional[Dict]:
-    return next((d for d in departments if (d.get("dean_flag") or "N").upper() == "Y"), None)
+    return _directory(departments).dean
 
 def course_by_alias(data: Dict, alias: str) -> Optional[Dict]:
     return None 
 
 def department_lookup(departments, name):
     if not name: return None
+    directory = _directory(departments)
     key = _norm_upper(name)
-    if key in DEPT_SYNONYMS: return get_department_by_id(departments, DEPT_SYNONYMS[key])
+    dept_id = ALIASES.resolve("department", name)
+    if dept_id: return directory.by_id.get(dept_id)
+    if key in directory.by_name: return directory.by_name[key]
+    d = directory.containing(key)
+    if d is not None: return d
+    norm = _normalize_phrase(name)
+    corrected = _department_typos(departments).correct(norm, TYPO_MAX_EDIT_DISTANCE)
+    if corrected != norm:
+        return department_lookup(departments, corrected)
+    if not directory.choices.keys: return None
+    result = _extract_one(directory.choices, name, fuzz.WRatio, 70)
+    return result[2] if result else None
+
+def get_department_by_id(departments, dept_id):
+    return _directory(departments).by_id.get(dept_id)
+
+
+class _DirectoryIndex(NamedTuple):
+    """Per-catalog department and faculty lookups for the leadership questions."""
+    by_id: Dict[str, Dict]
+    by_name: Dict[str, Dict]
+    names: str
+    name_starts: List[int]
+    rows: List[Dict]
+    choices: _Choices
+    heads: List[Dict]
+    dean: Optional[Dict]
+    faculty_by_dept: Dict[str, List[Dict]]
+    faculty_heads: Dict[str, str]
+
+    def containing(self, key: str) -> Optional[Dict]:
+        """The first department whose normalized name contains `key`."""
+        # Names are joined with NUL, which _norm_upper never leaves in a key,
+        # so one str.find replaces a loop over the departments.
+        pos = self.names.find(key)
+        if pos < 0 or not self.rows:
+            return None
+        return self.rows[bisect.bisect_right(self.name_starts, pos) - 1]
+
+    def head_of(self, dept: Dict) -> Optional[str]:
+        """The department's listed head, else the head on the faculty roster."""
+        return dept.get("department_head") or self.faculty_heads.get(dept.get("department_id"))
+
+
+def _build_directory_index(departments: List[Dict], faculty: Sequence[Dict] = ()) -> _DirectoryIndex:
+    faculty_by_dept: Dict[str, List[Dict]] = {}
+    faculty_heads: Dict[str, str] = {}
+    for f in faculty:
+        dept_id = f.get("department_id")
+        faculty_by_dept.setdefault(dept_id, []).append(f)
+        if (f.get("title") or "").lower() in ("dean", "department head") and f.get("full_name"):
+            faculty_heads.setdefault(dept_id, f["full_name"])
+
+    by_id: Dict[str, Dict] = {}
+    by_name: Dict[str, Dict] = {}
+    names: List[str] = []
     for d in departments:
-        if _norm_upper(d.get("department_name")) == key: return d
+        by_id.setdefault(d.get("department_id"), d)
+        name = _norm_upper(d.get("department_name"))
+        by_name.setdefault(name, d)
+        names.append(name)
+    name_starts, pos = [], 0
+    for name in names:
+        name_starts.append(pos)
+        pos += len(name) + 1
+
+    heads = []
     for d in departments:
-        if key in _norm_upper(d.get("department_name")): return d
-    choices = {d.get("department_name") or "": d for d in departments}
-    if not choices: return None
-    result = process.extractOne(name, list(choices.keys()), scorer=fuzz.WRatio, score_cutoff=70, processor=utils.default_process)
-    if result: return choices[result[0]]
-    return None
+        head = d.get("department_head") or faculty_heads.get(d.get("department_id")) or ""
+        if head:
+            heads.append({"department_id": d.get("department_id"), "department_name": d.get("department_name"), "department_head": head, "dean_flag": d.get("dean_flag") or "N"})
+    heads.sort(key=lambda r: 0 if (r.get("dean_flag") or "N").upper() == "Y" else 1)
+    dean = next((d for d in departments if (d.get("dean_flag") or "N").upper() == "Y"), None)
+
+    return _DirectoryIndex(
+        by_id, by_name, "\0".join(names), name_starts, list(departments),
+        _choices({d.get("department_name") or "": d for d in departments}),
+        heads, dean, faculty_by_dept, faculty_heads,
+    )
 
-def get_department_by_id(departments, dept_id):
-    return next((d for d in departments if d.get("department_id") == dept_id), None)
+
+def _directory(departments: List[Dict], faculty: Optional[Sequence[Dict]] = None) -> _DirectoryIndex:
+    """The directory of `departments`, joined with the roster load_all() read with them."""
+    if faculty is None:
+        with _choice_lock:
+            faculty = _rosters.get(id(departments), ((), ()))[1]
+    return _per_catalog("directory", departments, lambda rows: _build_directory_index(rows, faculty), faculty)
+
+
+def faculty_by_department(data: Dict, dept_id: str) -> List[Dict]:
+    return list(_directory(data["departments"], data.get("faculty")).faculty_by_dept.get(dept_id, ()))
 
 def _norm_upper(s): return _PUNCT.sub(" ", (s or "")).upper().strip()
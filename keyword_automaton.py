@@ -0,0 +1,98 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+def _compile(words: Sequence[str]) -> Tuple[List[Dict[str, int]], List[Tuple[int, ...]]]:
+    """Aho-Corasick transition table and, per state, the indices of every
+    word in `words` that ends there (directly or through failure links)."""
+    goto: List[Dict[str, int]] = [{}]
+    out: List[List[int]] = [[]]
+    for i, word in enumerate(words):
+        if not word:
+            continue
+        state = 0
+        for ch in word:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                out.append([])
+            state = nxt
+        out[state].append(i)
+
+    fail = [0] * len(goto)
+    order: List[int] = []
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        order.append(state)
+        for ch, nxt in goto[state].items():
+            f = fail[state]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(ch, 0)
+            out[nxt] += out[fail[nxt]]
+            queue.append(nxt)
+
+    # Fold the failure links into a complete transition table so that
+    # scanning is a single dict lookup per character.
+    delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+    for state in order:
+        row = dict(delta[fail[state]])
+        row.update(goto[state])
+        delta[state] = row
+    return delta, [tuple(o) for o in out]
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over a fixed keyword set.
+
+    Each keyword carries an integer bitmask; scan() walks the text once and
+    returns the OR of the masks of every keyword that occurs as a substring.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        pairs = list(keywords)
+        delta, ends = _compile([word for word, _ in pairs])
+        out = []
+        for idx in ends:
+            mask = 0
+            for i in idx:
+                mask |= pairs[i][1]
+            out.append(mask)
+        self._delta = delta
+        self._out = out
+
+    def scan(self, text: str) -> int:
+        delta, out = self._delta, self._out
+        state = 0
+        hits = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            hits |= out[state]
+        return hits
+
+
+class PatternAutomaton:
+    """Aho-Corasick automaton that reports where each pattern occurs.
+
+    matches() takes the text as an iterable of (position, character) pairs so
+    callers can fold case or skip characters while keeping positions in the
+    original string; it yields (start, end, pattern index) for every
+    occurrence, with `end` exclusive.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self._delta, self._ends = _compile(patterns)
+        self._lengths = [len(p) for p in patterns]
+
+    def matches(self, chars: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, int, int]]:
+        delta, ends, lengths = self._delta, self._ends, self._lengths
+        positions: List[int] = []
+        state = 0
+        for pos, ch in chars:
+            positions.append(pos)
+            state = delta[state].get(ch, 0)
+            for i in ends[state]:
+                yield positions[len(positions) - lengths[i]], pos + 1, i
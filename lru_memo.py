@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class LRUMemo:
+    """Size-bounded least-recently-used memo with hit/miss/eviction counters.
+
+    Values are computed outside the lock, so two threads missing on the same
+    key may both compute it; the last one wins, which is fine for pure
+    functions.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable, compute: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def discard(self, stale: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key `stale` accepts; returns how many."""
+        with self._lock:
+            keys = [k for k in self._data if stale(k)]
+            for k in keys:
+                del self._data[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data), "hits": self.hits,
+            "misses": self.misses, "evictions": self.evictions,
+        }
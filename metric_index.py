@@ -0,0 +1,54 @@
+from typing import List, Sequence, Union
+
+import numpy as np
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
+
+
+class PivotIndex:
+    """Pivot-table metric index (LAESA) over a list of strings.
+
+    Distances from every string to a few pivots are computed once. For a
+    query, the triangle inequality turns its distances to the same pivots
+    into a lower bound on its distance to every string, so only strings
+    whose bound is in range need a real comparison. The empty string is
+    always the first pivot, which makes length difference one of the bounds.
+    """
+
+    def __init__(self, strings: Sequence[str], pivots: int = 8, distance=Indel.distance):
+        self.strings = np.array(list(strings), dtype=object)
+        self._distance = distance
+        self._pivots: List[str] = [""]
+        columns = [self._distances("", self.strings)]
+        # Farthest-first: each new pivot is the string worst covered so far.
+        nearest = columns[0].copy()
+        for _ in range(pivots):
+            if not len(self.strings):
+                break
+            i = int(nearest.argmax())
+            if nearest[i] == 0:
+                break
+            self._pivots.append(self.strings[i])
+            columns.append(self._distances(self.strings[i], self.strings))
+            np.minimum(nearest, columns[-1], out=nearest)
+        # One contiguous row per pivot keeps the per-query filter vectorized.
+        self._columns = np.stack(columns).astype(np.int16)
+
+    def _distances(self, query: str, strings: Sequence[str]) -> np.ndarray:
+        if not len(strings):
+            return np.zeros(0, dtype=np.int32)
+        return process.cdist([query], strings, scorer=self._distance, dtype=np.int32)[0]
+
+    def candidates(self, query: str, k: Union[int, np.ndarray]) -> np.ndarray:
+        """Positions, in list order, that the pivots cannot rule out of distance `k`.
+
+        `k` may also be an array giving a separate bound for each string.
+        """
+        if not len(self.strings):
+            return np.zeros(0, dtype=np.intp)
+        qd = self._distances(query, self._pivots)
+        ok = np.abs(self._columns[0] - qd[0]) <= k
+        for column, d in zip(self._columns[1:], qd[1:]):
+            ok &= np.abs(column - d) <= k
+        return np.flatnonzero(ok)
+
@@ -1,145 +1,69 @@
+import hashlib
+import itertools
+import os
+import pickle
 import re
-from typing import Dict, List, Optional
-
-import spacy
-from spacy.matcher import Matcher, PhraseMatcher
-
-nlp = spacy.blank("en")
-
-matcher = Matcher(nlp.vocab)
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# spaCy takes most of a second to import, so it is only pulled in when the
+# first engine is built or loaded (off the UI thread in app.py).
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.matcher import Matcher, PhraseMatcher
+    from spacy.tokens import Doc
+
+import alias_registry
+from alias_registry import ALIASES
+from keyword_automaton import KeywordAutomaton
 
 WS_RE = re.compile(r"\s+")
 CODE_RE = re.compile(r"\b([A-Za-z]{2,4})[\s-]?(\d{2,})\b")
 
-PROGRAM_CANON = {
-    "CS": "BS in Computer Science",
-    "BSCS": "BS in Computer Science",
-    "COMPUTER SCIENCE": "BS in Computer Science",
-    "BS COMPUTER SCIENCE": "BS in Computer Science",
-
-    "PSYCH": "BS in Psychology",
-    "BS PSYCH": "BS in Psychology",
-    "PSYCHOLOGY": "BS in Psychology",
-    "BS PSYCHOLOGY": "BS in Psychology",
-
-    "POLSAY": "BA in Political Science",
-    "POLSCI": "BA in Political Science",
-    "POL SCI": "BA in Political Science",
-    "AB POLSCI": "BA in Political Science",
-    "AB PS": "BA in Political Science",
-    "ABPS": "BA in Political Science",
-    "BAPS": "BA in Political Science",
-    "BA PS": "BA in Political Science",
-    "POLITICAL SCIENCE": "BA in Political Science",
-    "BA POLITICAL SCIENCE": "BA in Political Science",
-    "AB POLITICAL SCIENCE": "BA in Political Science",
-
-    "BAEL": "BA in English Language",
-    "ABEL": "BA in English Language",
-    "ENGLISH LANGUAGE": "BA in English Language",
-
-    "BACOMM": "BA in Communications",
-    "COMM": "BA in Communications",
-    "COMMUNICATION": "BA in Communications",
-    "COMMUNICATIONS": "BA in Communications",
-    "AB COMM": "BA in Communications",
-    "BA COMM": "BA in Communications",
-    "BA COMMUNICATION": "BA in Communications",
-
-    "BIO": "BS in Biology",
-    "BS BIO": "BS in Biology",
-    "BIOLOGY": "BS in Biology",
-    "BS BIOLOGY": "BS in Biology",
-}
-
-
-def norm_key(s: str) -> str:
-    return "".join(s or "").strip().upper()
-
-PROGRAM_ABBREVIATIONS: Dict[str, str] = {norm_key(k): v for k, v in PROGRAM_CANON.items()}
-
-DEPT_ALIASES = [
-    "CAS", "College of Arts and Sciences",
-    "Computer Science", "Comp Sci", "CS", "CS Department", "CS Dept", "CS Dept.",
-    "Social Sciences", "SocSci",
-    "Language and Literature", "Lang & Lit", "Lang Lit",
-    "Natural Sciences", "NatSci",
-    "Mathematics", "Math", "Math Department", "Math Dept",
-]
-
 YEAR_MAP_STRICT = {
     "freshman": 1, "sophomore": 2, "junior": 3, "senior": 4,
     "first": 1, "second": 2, "third": 3, "fourth": 4,
     "1st": 1, "2nd": 2, "3rd": 3, "4th": 4
 }
 
-def build_gazetteers(
-    programs: List[Dict],
-    courses: List[Dict],
-    departments: Optional[List[Dict]] = None,
-) -> None:
+GAZETTEER_BATCH_SIZE = 256
+NLU_BATCH_SIZE = 1000
 
-    if "PROG" in phrase_matcher:
-        phrase_matcher.remove("PROG")
+NLU_CACHE_PATH = Path(__file__).parent / ".cache" / "nlu_compiled.pkl"
 
-    prog_docs = [
-        nlp(p["program_name"])
-        for p in programs
-        if p.get("program_name")
-    ]
-    base_docs: List = []
 
+def _gazetteer_phrases(
+    programs: Sequence[Dict],
+    courses: Sequence[Dict],
+    departments: Optional[Sequence[Dict]] = None,
+) -> Dict[str, List[str]]:
+    prog_names = [p["program_name"] for p in programs if p.get("program_name")]
+    base_names: List[str] = []
     for p in programs:
         name = p.get("program_name") or ""
         low = name.lower()
-        if low.startswith("bs "):
-            base_docs.append(nlp(name[3:]))
-        elif low.startswith("ba "):
-            base_docs.append(nlp(name[3:]))
-
-    abbrev_docs = [nlp(k) for k in PROGRAM_ABBREVIATIONS.keys()]
-    all_prog_docs = prog_docs + base_docs + abbrev_docs
-
-    if all_prog_docs:
-        phrase_matcher.add("PROG", all_prog_docs)
-
-    if "COURSETITLE" in phrase_matcher:
-        phrase_matcher.remove("COURSETITLE")
-
-    title_docs = [
-        nlp(c["course_title"])
-        for c in courses
-        if c.get("course_title")
-    ]
-
-    if title_docs:
-        phrase_matcher.add("COURSETITLE", title_docs)
-
-    if "DEPT" in phrase_matcher:
-        phrase_matcher.remove("DEPT")
-
-    dept_docs = [nlp(x) for x in DEPT_ALIASES]
+        if low.startswith("bs ") or low.startswith("ba "):
+            base_names.append(name[3:])
 
+    dept_names = ALIASES.aliases("department")
     if departments:
-        dept_docs += [
-            nlp(d.get("department_name") or "")
-            for d in departments
-            if d.get("department_name")
-        ]
+        dept_names += [d["department_name"] for d in departments if d.get("department_name")]
 
-    if dept_docs:
-        phrase_matcher.add("DEPT", dept_docs)
+    return {
+        "PROG": prog_names + base_names + ALIASES.aliases("program"),
+        "COURSETITLE": [c["course_title"] for c in courses if c.get("course_title")],
+        "DEPT": dept_names,
+    }
 
-def add_lower_in(name: str, words: List[str]) -> None:
-    matcher.add(name, [[{"LOWER": {"IN": words}}]])
 
-add_lower_in("INTENT_GREET", ["hi", "hello", "hey"])
-add_lower_in("INTENT_GOODBYE", ["bye", "goodbye", "thanks", "thank", "tnx"])
+INTENT_PATTERNS: Dict[str, List[List[Dict]]] = {
+    "INTENT_GREET": [[{"LOWER": {"IN": ["hi", "hello", "hey"]}}]],
+    "INTENT_GOODBYE": [[{"LOWER": {"IN": ["bye", "goodbye", "thanks", "thank", "tnx"]}}]],
 
-matcher.add(
-    "INTENT_MAJOR_MINOR",
-    [
+    "INTENT_MAJOR_MINOR": [
         [{"LOWER": "major"}, {"LOWER": "subjects"}],
         [{"LOWER": "minor"}, {"LOWER": "subjects"}],
         [{"LOWER": "non"}, {"LOWER": "major"}],
@@ -150,11 +74,8 @@ matcher.add(
         [{"LOWER": "minors"}],
         [{"LOWER": "what"}, {"LOWER": "are"}, {"LOWER": "the"}, {"LOWER": "majors"}],
     ],
-)
 
-matcher.add(
-    "INTENT_PREREQ",
-    [
+    "INTENT_PREREQ": [
         [{"LOWER": {"IN": ["prereq", "prereqs", "prerequisite", "prerequisites", "requirement", "requirements"]}}],
         [
             {"LOWER": {"IN": ["what", "whats", "what's"]}},
@@ -182,21 +103,15 @@ matcher.add(
             {"LOWER": "of"},
         ],
     ],
-)
 
-matcher.add(
-    "INTENT_UNITS",
-    [
+    "INTENT_UNITS": [
         [{"LOWER": "how"}, {"LOWER": "many"}, {"LOWER": "units"}],
         [{"LOWER": "units"}, {"LOWER": {"IN": ["for", "of", "in"]}}],
         [{"LOWER": {"IN": ["total", "sum", "load"]}}, {"LOWER": "units"}],
         [{"LOWER": "units"}, {"IS_PUNCT": True}],
     ],
-)
 
-matcher.add(
-    "INTENT_MAX_UNITS",
-    [
+    "INTENT_MAX_UNITS": [
         [{"LOWER": {"IN": ["maximum", "max"]}}, {"LOWER": {"IN": ["units", "unit", "load"]}}],
         [{"LOWER": "highest"}, {"LOWER": "number"}, {"LOWER": "of"}, {"LOWER": "units"}],
         [{"LOWER": "maximum"}, {"LOWER": "number"}, {"LOWER": "of"}, {"LOWER": "units"}],
@@ -204,11 +119,8 @@ matcher.add(
         [{"LOWER": "overloading"}],
         [{"LOWER": "as"}, {"LOWER": "many"}, {"LOWER": "units"}, {"LOWER": "as"}],
     ],
-)
 
-matcher.add(
-    "INTENT_WHEN_TAKEN",
-    [
+    "INTENT_WHEN_TAKEN": [
         [{"LOWER": "what"}, {"LOWER": "year"}],
         [{"LOWER": "which"}, {"LOWER": "year"}],
         [{"LOWER": "when"}, {"LOWER": "do"}, {"LOWER": {"IN": ["i", "we", "students"]}}, {"LOWER": "take"}],
@@ -217,22 +129,16 @@ matcher.add(
         [{"LOWER": "in"}, {"LOWER": "what"}, {"LOWER": "year"}, {"LOWER": "is"}],
         [{"LOWER": "is"}, {"OP": "+"}, {"LOWER": {"IN": ["1st", "2nd", "3rd", "4th", "first", "second", "third", "fourth"]}}, {"LOWER": {"IN": ["year", "yr"]}}],
         [{"LOWER": "what"}, {"LOWER": "level"}, {"LOWER": "is"}],
-    ]
-)
+    ],
 
-matcher.add(
-    "INTENT_LAB_SUBJECTS",
-    [
+    "INTENT_LAB_SUBJECTS": [
         [{"LOWER": {"IN": ["lab", "laboratory"]}}, {"LOWER": {"IN": ["subjects", "courses", "classes", "units"]}}],
         [{"LOWER": {"IN": ["lab", "laboratory"]}}],
         [{"LOWER": "which"}, {"LOWER": "subjects"}, {"LOWER": "have"}, {"LOWER": {"IN": ["labs", "laboratories"]}}],
         [{"LOWER": "lab"}, {"LOWER": "in"}, {"LOWER": "the"}, {"LOWER": "code"}], 
-    ]
-)
+    ],
 
-matcher.add(
-    "INTENT_DEPT_HEADS_LIST",
-    [
+    "INTENT_DEPT_HEADS_LIST": [
         [
             {"LOWER": {"IN": ["list", "show", "different", "all"]}},
             {"LOWER": {"IN": ["department", "dept", "dept."]}},
@@ -250,11 +156,8 @@ matcher.add(
             {"LOWER": {"IN": ["heads", "chairs", "leadership"]}},
         ],
     ],
-)
 
-matcher.add(
-    "INTENT_DEPT_HEAD_ONE",
-    [
+    "INTENT_DEPT_HEAD_ONE": [
         [
             {"LOWER": {"IN": ["who", "who's", "whos"]}},
             {"LOWER": {"IN": ["is"]}, "OP": "?"},
@@ -274,75 +177,41 @@ matcher.add(
             {"LOWER": {"IN": ["head", "haed", "hed", "chair"]}},
         ],
     ],
+}
+
+KW_DEAN, KW_HEADS, KW_DEPT_HEAD, KW_MAJOR_MINOR, KW_LAB, KW_MAX_UNITS, KW_PREREQ, KW_YEAR, KW_PROGRAM, KW_SUBJECT = (
+    1 << i for i in range(10)
 )
 
-def detect_intent(text: str) -> str:
-    doc = nlp(text or "")
-    labels = [nlp.vocab.strings[mid] for mid, _, _ in matcher(doc)]
-    tlow = (text or "").lower().strip()
-
-    if "dean" in tlow:
-        return "dept_head_one"
-    if "heads" in tlow or "leadership" in tlow:
-        return "dept_heads_list"
-    if "INTENT_DEPT_HEADS_LIST" in labels or tlow in {
-        "department heads",
-        "dept heads",
-        "dept. heads",
-        "different department heads",
-    }:
-        return "dept_heads_list"
-    if "INTENT_DEPT_HEAD_ONE" in labels or (
-        "dept head" in tlow or "department head" in tlow or "who's the" in tlow
-    ):
-        return "dept_head_one"
-    if "INTENT_MAJOR_MINOR" in labels or any(x in tlow for x in ["major", "minor", "non-major", "non-minor"]):
-        return "major_minor_subjects"
-
-    if "INTENT_LAB_SUBJECTS" in labels or "lab" in tlow or "laboratory" in tlow:
-        return "lab_subjects"
-
-    if "INTENT_MAX_UNITS" in labels or any(x in tlow for x in ["maximum", "max units", "overload", "highest number of units"]):
-        return "max_units"
-
-    if "INTENT_PREREQ" in labels or "prereq" in tlow or "prerequisite" in tlow:
-        return "prerequisites"
-
-    if "INTENT_WHEN_TAKEN" in labels:
-        return "when_taken"
-
-    if "INTENT_UNITS" in labels or re.search(r"\bunits?\b", tlow):
-        return "units"
-
-    has_year_hint = (
-        "year" in tlow
-        or "yr " in tlow
-        or any(x in tlow for x in ["1st", "2nd", "3rd", "4th", "first", "second", "third", "fourth", "freshman", "sophomore", "junior", "senior"])
-    )
-    
-    has_prog_hint = any(
-        x in tlow
-        for x in [
-            "cs", "computer science", "bscs", "bs cs",
-            "psych", "psychology", "bs psych",
-            "bio", "biology", "bsbio", "bs bio",
-            "political science", "polsci", "ab ps", "abps", "baps", "ba ps",
-            "communication", "comm",
-            "bael", "abel", "english language",
-        ]
-    )
-
-    if has_year_hint and has_prog_hint:
-        return "curriculum"
-        
-    if any(w in tlow for w in ["subject", "subjects", "course", "courses", "curriculum", "prospectus", "study plan"]):
-        if has_prog_hint:
-             return "curriculum"
+INTENT_KEYWORDS: Dict[int, List[str]] = {
+    KW_DEAN: ["dean"],
+    KW_HEADS: ["heads", "leadership"],
+    KW_DEPT_HEAD: ["dept head", "department head", "who's the"],
+    KW_MAJOR_MINOR: ["major", "minor", "non-major", "non-minor"],
+    KW_LAB: ["lab", "laboratory"],
+    KW_MAX_UNITS: ["maximum", "max units", "overload", "highest number of units"],
+    KW_PREREQ: ["prereq", "prerequisite"],
+    KW_YEAR: [
+        "year", "yr ",
+        "1st", "2nd", "3rd", "4th", "first", "second", "third", "fourth",
+        "freshman", "sophomore", "junior", "senior",
+    ],
+    KW_PROGRAM: [
+        "cs", "computer science", "bscs", "bs cs",
+        "psych", "psychology", "bs psych",
+        "bio", "biology", "bsbio", "bs bio",
+        "political science", "polsci", "ab ps", "abps", "baps", "ba ps",
+        "communication", "comm",
+        "bael", "abel", "english language",
+    ],
+    KW_SUBJECT: ["subject", "subjects", "course", "courses", "curriculum", "prospectus", "study plan"],
+}
 
-    if has_prog_hint:
-        return "vague_program"
+intent_keywords = KeywordAutomaton(
+    (word, bit) for bit, words in INTENT_KEYWORDS.items() for word in words
+)
 
-    return "courseinfo"
+UNITS_WORD_RE = re.compile(r"\bunits?\b")
 
 
 def _extract_year(text: str) -> Optional[int]:
@@ -368,20 +237,337 @@ def _extract_term(text: str) -> Optional[int]:
         return 3
     return None
 
+
+class NLUEngine:
+    """Tokenizer, intent matcher and gazetteers for one catalog.
+
+    An engine is not mutated after construction, so it can be shared across
+    threads. To reload, build a new engine and swap it in with set_engine().
+    """
+
+    def __init__(
+        self,
+        nlp: "Language",
+        matcher: "Matcher",
+        phrase_matcher: "PhraseMatcher",
+        sources: Dict[str, Tuple[str, ...]],
+        phrase_docs: Optional[Dict[str, List["Doc"]]] = None,
+    ):
+        self.nlp = nlp
+        self.matcher = matcher
+        self.phrase_matcher = phrase_matcher
+        self._sources = sources
+        self._phrase_docs = phrase_docs or {}
+
+    @classmethod
+    def build(
+        cls,
+        programs: Sequence[Dict] = (),
+        courses: Sequence[Dict] = (),
+        departments: Optional[Sequence[Dict]] = None,
+        base: Optional["NLUEngine"] = None,
+    ) -> "NLUEngine":
+        """Build an engine for a catalog.
+
+        With `base`, the tokenizer and intent matcher are shared and only the
+        gazetteer labels whose phrases changed are tokenized again.
+        """
+        phrases_by_label = _gazetteer_phrases(programs, courses, departments)
+        sources = {label: tuple(phrases) for label, phrases in phrases_by_label.items()}
+        if base is not None and base._sources == sources:
+            return base
+
+        if base is not None:
+            nlp, matcher = base.nlp, base.matcher
+        else:
+            import spacy
+            from spacy.matcher import Matcher
+
+            nlp = spacy.blank("en")
+            matcher = Matcher(nlp.vocab)
+            for label, patterns in INTENT_PATTERNS.items():
+                matcher.add(label, patterns)
+
+        from spacy.matcher import PhraseMatcher
+
+        phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        phrase_docs: Dict[str, List["Doc"]] = {}
+        for label, phrases in phrases_by_label.items():
+            docs = None
+            if base is not None and base._sources.get(label) == sources[label]:
+                docs = base._phrase_docs.get(label)
+            if docs is None:
+                # The matcher only needs token attributes, so tokenize in
+                # batches instead of running each phrase through the pipeline.
+                docs = list(nlp.tokenizer.pipe(phrases, batch_size=GAZETTEER_BATCH_SIZE))
+            if docs:
+                phrase_matcher.add(label, docs)
+            phrase_docs[label] = docs
+        return cls(nlp, matcher, phrase_matcher, sources, phrase_docs)
+
+    def with_catalog(
+        self,
+        programs: List[Dict],
+        courses: List[Dict],
+        departments: Optional[List[Dict]] = None,
+    ) -> "NLUEngine":
+        return NLUEngine.build(programs, courses, departments, base=self)
+
+    def _state(self) -> bytes:
+        # Pickled together, the vocab and both matchers come back sharing one
+        # Vocab instance.
+        return pickle.dumps((self.nlp.vocab, self.matcher, self.phrase_matcher, self._sources))
+
+    def __reduce__(self):
+        return NLUEngine._from_state, (self._state(),)
+
+    @classmethod
+    def _from_state(cls, state: bytes) -> "NLUEngine":
+        import spacy
+
+        vocab, matcher, phrase_matcher, sources = pickle.loads(state)
+        return cls(spacy.blank("en", vocab=vocab), matcher, phrase_matcher, sources)
+
+    def save(self, key: str, path: Path = NLU_CACHE_PATH) -> None:
+        state = self._state()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"key": key, "state": state}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, key: str, path: Path = NLU_CACHE_PATH) -> Optional["NLUEngine"]:
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+            if payload.get("key") != key:
+                return None
+            return cls._from_state(payload["state"])
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return None
+
+    def detect_intent(self, text: str) -> str:
+        return self._intent(self.nlp(text or ""))
+
+    def extract_entities(self, text: str) -> Dict[str, Optional[str]]:
+        return self._entities(self.nlp(text or ""))
+
+    def detect_intents(
+        self,
+        texts: Iterable[str],
+        batch_size: int = NLU_BATCH_SIZE,
+        n_process: int = 1,
+    ) -> Iterator[str]:
+        """Lazily yield detect_intent() for each text, tokenizing in batches."""
+        return self._map("_intent", texts, batch_size, n_process)
+
+    def extract_entities_batch(
+        self,
+        texts: Iterable[str],
+        batch_size: int = NLU_BATCH_SIZE,
+        n_process: int = 1,
+    ) -> Iterator[Dict[str, Optional[str]]]:
+        """Lazily yield extract_entities() for each text, tokenizing in batches."""
+        return self._map("_entities", texts, batch_size, n_process)
+
+    def _map(self, method: str, texts: Iterable[str], batch_size: int, n_process: int) -> Iterator:
+        if n_process < 0:
+            n_process = os.cpu_count() or 1
+        if n_process <= 1:
+            fn = getattr(self, method)
+            # The tokenizer keeps the original string on doc.text, so the
+            # matchers and the regex helpers can both work from the Doc.
+            for doc in self.nlp.pipe((t or "" for t in texts), batch_size=batch_size):
+                yield fn(doc)
+            return
+
+        # Workers run the whole engine rather than nlp.pipe(n_process=...),
+        # which would ship every Doc back to this process. At most two
+        # batches per worker are in flight so memory stays flat.
+        # Forked workers inherit the engine as is; other start methods pickle
+        # it through __reduce__.
+        with ProcessPoolExecutor(n_process, initializer=_init_worker, initargs=(self,)) as pool:
+            pending: Deque[Future] = deque()
+            it = iter(texts)
+            while True:
+                chunk = list(itertools.islice(it, batch_size))
+                if chunk:
+                    pending.append(pool.submit(_worker_map, method, chunk))
+                if pending and (not chunk or len(pending) >= 2 * n_process):
+                    yield from pending.popleft().result()
+                elif not chunk:
+                    return
+
+    def _intent(self, doc: "Doc") -> str:
+        text = doc.text
+        labels = {self.matcher.vocab.strings[mid] for mid, _, _ in self.matcher(doc)}
+        tlow = text.lower().strip()
+        hits = intent_keywords.scan(tlow)
+
+        if hits & KW_DEAN:
+            return "dept_head_one"
+        if hits & KW_HEADS:
+            return "dept_heads_list"
+        if "INTENT_DEPT_HEADS_LIST" in labels or tlow in {
+            "department heads",
+            "dept heads",
+            "dept. heads",
+            "different department heads",
+        }:
+            return "dept_heads_list"
+        if "INTENT_DEPT_HEAD_ONE" in labels or hits & KW_DEPT_HEAD:
+            return "dept_head_one"
+        if "INTENT_MAJOR_MINOR" in labels or hits & KW_MAJOR_MINOR:
+            return "major_minor_subjects"
+
+        if "INTENT_LAB_SUBJECTS" in labels or hits & KW_LAB:
+            return "lab_subjects"
+
+        if "INTENT_MAX_UNITS" in labels or hits & KW_MAX_UNITS:
+            return "max_units"
+
+        if "INTENT_PREREQ" in labels or hits & KW_PREREQ:
+            return "prerequisites"
+
+        if "INTENT_WHEN_TAKEN" in labels:
+            return "when_taken"
+
+        if "INTENT_UNITS" in labels or UNITS_WORD_RE.search(tlow):
+            return "units"
+
+        has_year_hint = bool(hits & KW_YEAR)
+        has_prog_hint = bool(hits & KW_PROGRAM)
+
+        if has_year_hint and has_prog_hint:
+            return "curriculum"
+
+        if hits & KW_SUBJECT:
+            if has_prog_hint:
+                 return "curriculum"
+
+        if has_prog_hint:
+            return "vague_program"
+
+        return "courseinfo"
+
+    def _entities(self, doc: "Doc") -> Dict[str, Optional[str]]:
+        text = doc.text
+        ents: Dict[str, Optional[str]] = {
+            "program": None, "course_title": None, "course_code": None,
+            "department": None, "year_num": None, "term_num": None,
+        }
+        m = CODE_RE.search(text)
+        if m: ents["course_code"] = f"{m.group(1)}{m.group(2)}"
+        for mid, s, e in self.phrase_matcher(doc):
+            label = self.phrase_matcher.vocab.strings[mid]
+            span_text = doc[s:e].text
+            if label == "PROG" and not ents["program"]: ents["program"] = span_text
+            elif label == "COURSETITLE" and not ents["course_title"]: ents["course_title"] = span_text
+            elif label == "DEPT" and not ents["department"]: ents["department"] = span_text
+        ents["year_num"] = _extract_year(text)
+        ents["term_num"] = _extract_term(text)
+        return ents
+
+
+_worker_engine: Optional[NLUEngine] = None
+
+
+def _init_worker(engine: NLUEngine) -> None:
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _worker_map(method: str, texts: List[str]) -> List:
+    return list(_worker_engine._map(method, texts, len(texts) or 1, 1))
+
+
+def compiled_cache_key(data_files: Iterable[Path]) -> str:
+    import spacy
+
+    h = hashlib.sha256()
+    h.update(spacy.__version__.encode())
+    h.update(Path(__file__).read_bytes())
+    # alias_registry decides which PROG and DEPT alias phrases there are.
+    h.update(Path(alias_registry.__file__).read_bytes())
+    for path in sorted(data_files):
+        h.update(path.name.encode())
+        # In blocks, so a large catalog file is never held whole.
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+_engine: Optional[NLUEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> NLUEngine:
+    global _engine
+    engine = _engine
+    if engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = NLUEngine.build()
+            engine = _engine
+    return engine
+
+
+def set_engine(engine: NLUEngine) -> None:
+    global _engine
+    _engine = engine
+
+
+def build_gazetteers(
+    programs: List[Dict],
+    courses: List[Dict],
+    departments: Optional[List[Dict]] = None,
+) -> NLUEngine:
+    engine = get_engine().with_catalog(programs, courses, departments)
+    set_engine(engine)
+    return engine
+
+
+def load_or_build_engine(
+    data: Dict, data_files: Iterable[Path], path: Path = NLU_CACHE_PATH, base: Optional[NLUEngine] = None,
+) -> NLUEngine:
+    """The engine from the compiled cache, or a new one that is then saved.
+
+    A new engine is built on `base` when given, so only the gazetteer labels
+    whose phrases changed are tokenized again.
+    """
+    key = compiled_cache_key(data_files)
+    engine = NLUEngine.load(key, path)
+    if engine is None:
+        engine = NLUEngine.build(data["programs"], data["courses"], data["departments"], base=base)
+        try:
+            engine.save(key, path)
+        except OSError:
+            pass
+    return engine
+
+
+def load_or_build_gazetteers(data: Dict, data_files: Iterable[Path], path: Path = NLU_CACHE_PATH) -> NLUEngine:
+    """Swap in the engine from the compiled cache, or build one on the current engine and save it."""
+    engine = load_or_build_engine(data, data_files, path, base=_engine)
+    set_engine(engine)
+    return engine
+
+
+def detect_intent(text: str) -> str:
+    return get_engine().detect_intent(text)
+
+
 def extract_entities(text: str) -> Dict[str, Optional[str]]:
-    doc = nlp(text or "")
-    ents: Dict[str, Optional[str]] = {
-        "program": None, "course_title": None, "course_code": None,
-        "department": None, "year_num": None, "term_num": None,
-    }
-    m = CODE_RE.search(text or "")
-    if m: ents["course_code"] = f"{m.group(1)}{m.group(2)}"
-    for mid, s, e in phrase_matcher(doc):
-        label = nlp.vocab.strings[mid]
-        span_text = doc[s:e].text
-        if label == "PROG" and not ents["program"]: ents["program"] = span_text
-        elif label == "COURSETITLE" and not ents["course_title"]: ents["course_title"] = span_text
-        elif label == "DEPT" and not ents["department"]: ents["department"] = span_text
-    ents["year_num"] = _extract_year(text)
-    ents["term_num"] = _extract_term(text)
-    return ents
+    return get_engine().extract_entities(text)
+
+
+def detect_intents(texts: Iterable[str], batch_size: int = NLU_BATCH_SIZE, n_process: int = 1) -> Iterator[str]:
+    return get_engine().detect_intents(texts, batch_size, n_process)
+
+
+def extract_entities_batch(
+    texts: Iterable[str], batch_size: int = NLU_BATCH_SIZE, n_process: int = 1
+) -> Iterator[Dict[str, Optional[str]]]:
+    return get_engine().extract_entities_batch(texts, batch_size, n_process)
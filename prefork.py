@@ -0,0 +1,43 @@
+"""Load the catalog once and share it with forked worker processes.
+
+A worker that loads the catalog itself holds a private copy of the records,
+the lookup indexes, the spaCy vocab and the gazetteers. preload() builds all
+of them in the loader process, with the catalog tables read from the
+read-only, memory-mapped SQLite file, and then freezes the heap so the
+cyclic GC never writes to those objects. Workers started by fork_workers()
+read the loader's pages copy-on-write instead of copying them.
+
+Fork from a loader that has not started other threads (not from inside a
+running Streamlit server); independent server processes can still share the
+catalog file through the SQLite backend.
+
+The Streamlit app does not use this module; it is a helper for bench.py
+and for deployments that start their own worker processes.
+"""
+import gc
+import multiprocessing
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import data_api
+import nlu_rules
+
+
+def preload(backend: str = "sqlite", nlu_cache: Optional[Path] = None) -> Dict:
+    data = data_api.load_all(backend)
+    nlu_rules.load_or_build_gazetteers(
+        data, data_api.catalog_files(), path=nlu_cache or nlu_rules.NLU_CACHE_PATH,
+    )
+    data_api.build_indexes(data)
+    gc.collect()
+    gc.freeze()
+    return data
+
+
+def fork_workers(n: int, target: Callable, *args) -> List[multiprocessing.Process]:
+    """Start `n` processes running target(*args), forked from this one."""
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=target, args=args, daemon=True) for _ in range(n)]
+    for w in workers:
+        w.start()
+    return workers
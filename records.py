@@ -0,0 +1,140 @@
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from typing import Any, Dict, FrozenSet, Iterator, Optional
+
+
+class _Record(Mapping):
+    """Read-only mapping view over a slotted dataclass.
+
+    Records stand in for the dicts the rest of the code was written against:
+    r["key"], r.get("key"), "key" in r and dict(r) all work. A field set to
+    None counts as missing, like an absent dict key. Keys that have no field
+    are kept in `extra`.
+    """
+
+    __slots__ = ()
+    _names: FrozenSet[str] = frozenset()
+    _INTERNED = ()
+    _INTS = ()
+    _FIELD_ORDER = ()
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any]) -> "_Record":
+        values: Dict[str, Any] = {}
+        extra: Dict[str, Any] = {}
+        for key, value in row.items():
+            if key in cls._names:
+                values[key] = value
+            else:
+                extra[key] = value
+        for key in cls._INTERNED:
+            if isinstance(values.get(key), str):
+                values[key] = sys.intern(values[key])
+        for key in cls._INTS:
+            if values.get(key) is not None:
+                try:
+                    values[key] = int(values[key])
+                except (TypeError, ValueError):
+                    pass
+        return cls(**values, extra=extra or None)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._names:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._names:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None or bool(self.extra and key in self.extra)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._FIELD_ORDER:
+            if getattr(self, name) is not None:
+                yield name
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Course(_Record):
+    course_id: Optional[str] = None
+    course_code: Optional[str] = None
+    course_title: Optional[str] = None
+    credit_units: Optional[str] = None
+    lecture_hours_per_week: Optional[str] = None
+    laboratory_hours_per_week: Optional[str] = None
+    remarks: Optional[str] = None
+    units: Optional[int] = None
+    lecture_units: Optional[int] = None
+    lab_units: Optional[int] = None
+    total_units: Optional[int] = None
+    lecture_minutes: Optional[int] = None
+    lab_minutes: Optional[int] = None
+    flags: Optional[FrozenSet[str]] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    _INTERNED = ("course_id", "course_code")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class PlanEntry(_Record):
+    program_id: Optional[str] = None
+    year_level: Optional[int] = None
+    semester: Optional[int] = None
+    course_id: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    _INTERNED = ("program_id", "course_id")
+    _INTS = ("year_level", "semester")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Prerequisite(_Record):
+    course_id: Optional[str] = None
+    prerequisite_course_id: Optional[str] = None
+    type: Optional[str] = None
+    course_code: Optional[str] = None
+    prerequisite_course_code: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    _INTERNED = ("course_id", "prerequisite_course_id", "type", "course_code", "prerequisite_course_code")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Program(_Record):
+    program_id: Optional[str] = None
+    program_name: Optional[str] = None
+    short_name: Optional[str] = None
+    department_id: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    _INTERNED = ("program_id", "department_id")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Department(_Record):
+    department_id: Optional[str] = None
+    department_name: Optional[str] = None
+    department_head: Optional[str] = None
+    dean_flag: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    _INTERNED = ("department_id",)
+
+
+for _cls in (Course, PlanEntry, Prerequisite, Program, Department):
+    _cls._FIELD_ORDER = tuple(f.name for f in fields(_cls) if f.name != "extra")
+    _cls._names = frozenset(_cls._FIELD_ORDER)
@@ -0,0 +1,36 @@
+"""Resolve a list of course names or codes to catalog entries.
+
+Usage:
+    python resolve_courses.py transcript.txt > resolved.tsv
+    python resolve_courses.py - < transcript.txt
+
+Reads one query per line and writes tab-separated input, course code,
+course title, match type and score.
+"""
+import argparse
+import sys
+
+from data_api import find_courses_bulk, load_all
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve course names to catalog entries")
+    parser.add_argument("file", help="text file with one course name or code per line, or - for stdin")
+    args = parser.parse_args()
+
+    if args.file == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.file, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    texts = [line.strip() for line in lines if line.strip()]
+
+    print("input\tcourse_code\tcourse_title\tmatch_type\tscore")
+    for text, (course, match_type, score) in zip(texts, find_courses_bulk(load_all(), texts)):
+        code = (course or {}).get("course_code", "")
+        title = (course or {}).get("course_title", "")
+        print(f"{text}\t{code}\t{title}\t{match_type}\t{score:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from records import Course, Department, PlanEntry, Prerequisite, Program, _Record
+
+SCHEMA_VERSION = 2
+MMAP_SIZE = 256 * 1024 * 1024
+FETCH_CHUNK = 512
+
+# table -> record type; None stores the row as a JSON object.
+TABLES: Dict[str, Optional[Type[_Record]]] = {
+    "courses": Course,
+    "plan": PlanEntry,
+    "prereqs": Prerequisite,
+    "programs": Program,
+    "departments": Department,
+    "faculty": None,
+}
+
+# Columns derived at build time so the hot queries are plain index lookups.
+_DERIVED = {
+    "courses": ("units_total", "code_key"),
+    "plan": ("year_code", "term_code", "course_row", "course_key"),
+    "prereqs": ("prereq_row", "is_course"),
+}
+
+_INDEXES = (
+    "CREATE INDEX courses_id ON courses(course_id)",
+    "CREATE INDEX plan_slice ON plan(program_id, year_code, term_code)",
+    "CREATE INDEX courses_code ON courses(code_key)",
+    "CREATE INDEX plan_course ON plan(course_key)",
+    "CREATE INDEX prereqs_pair ON prereqs(course_id, prerequisite_course_id)",
+    "CREATE INDEX prereqs_target ON prereqs(prerequisite_course_id)",
+)
+
+
+def _columns(table: str) -> Tuple[str, ...]:
+    record = TABLES[table]
+    return (record._FIELD_ORDER if record else ()) + ("extra",)
+
+
+def _encode(table: str, row) -> List[Any]:
+    record = TABLES[table]
+    if record is None:
+        return [json.dumps(dict(row))]
+    values = []
+    for name in record._FIELD_ORDER:
+        value = getattr(row, name) if isinstance(row, record) else row.get(name)
+        if name == "flags" and value is not None:
+            value = "," + ",".join(sorted(value)) + ","
+        values.append(value)
+    extra = row.extra if isinstance(row, record) else {k: v for k, v in row.items() if k not in record._names}
+    values.append(json.dumps(extra) if extra else None)
+    return values
+
+
+def _decode(table: str, names: Tuple[str, ...], values: Tuple) -> Any:
+    record = TABLES[table]
+    if record is None:
+        return json.loads(values[0])
+    row = {}
+    for name, value in zip(names, values):
+        if value is None:
+            continue
+        if name == "extra":
+            row.update(json.loads(value))
+        elif name == "flags":
+            row[name] = frozenset(value.strip(",").split(",")) - {""}
+        else:
+            row[name] = value
+    return record.from_dict(row)
+
+
+def _code(value) -> int:
+    # PlanEntry already holds year and term as ints; anything else never matches.
+    return value if type(value) is int and value >= 0 else -1
+
+
+def code_key(code) -> str:
+    """A course code as find_course_by_code compares it."""
+    return (code or "").strip().upper().replace(" ", "").replace("-", "")
+
+
+def course_key(course_id) -> str:
+    """A course id as get_course_curriculum_entries compares it."""
+    return str(course_id or "").strip().upper()
+
+
+def build_database(data: Dict, path: Path, source_key: str) -> None:
+    """Write the catalog tables of load_all() data to an SQLite file.
+
+    The file is written next to `path` and renamed over it, so workers that
+    already have the old file open keep reading a consistent copy.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    if tmp.exists():
+        tmp.unlink()
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("schema_version", str(SCHEMA_VERSION)), ("source_key", source_key),
+        ])
+        for table in TABLES:
+            cols = _columns(table) if TABLES[table] else ("data",)
+            cols += _DERIVED.get(table, ())
+            conn.execute(f"CREATE TABLE {table} ({', '.join(cols)})")
+
+        courses = data["courses"]
+        first_row: Dict[str, int] = {}
+        last_row: Dict[str, int] = {}
+        for i, c in enumerate(courses, 1):
+            if c.get("course_id"):
+                first_row.setdefault(c["course_id"], i)
+                last_row[c["course_id"]] = i
+        derived = {
+            "courses": lambda c: (c.get("total_units") or 0, code_key(c.get("course_code"))),
+            "plan": lambda p: (
+                _code(p.get("year_level")), _code(p.get("semester")), first_row.get(p.get("course_id")),
+                course_key(p.get("course_id")),
+            ),
+            "prereqs": lambda p: (
+                last_row.get(p.get("prerequisite_course_id")),
+                int((p.get("type") or "course").lower() == "course"),
+            ),
+        }
+        for table in TABLES:
+            extra = derived.get(table, lambda row: ())
+            width = len(_columns(table)) + len(_DERIVED.get(table, ()))
+            if TABLES[table] is None:
+                width = 1
+            marks = ", ".join("?" * width)
+            conn.executemany(
+                f"INSERT INTO {table} VALUES ({marks})",
+                (_encode(table, row) + list(extra(row)) for row in data.get(table, ())),
+            )
+        for sql in _INDEXES:
+            conn.execute(sql)
+        conn.execute(
+            "CREATE VIRTUAL TABLE course_titles USING fts5("
+            "course_title, course_code, content='courses', content_rowid='rowid')"
+        )
+        conn.execute("INSERT INTO course_titles(course_titles) VALUES ('rebuild')")
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+def source_key_of(path: Path) -> Optional[str]:
+    """The source key a database file was built from, or None if unusable."""
+    if not Path(path).exists():
+        return None
+    try:
+        conn = sqlite3.connect(f"{Path(path).as_uri()}?mode=ro", uri=True)
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return None
+    if meta.get("schema_version") != str(SCHEMA_VERSION):
+        return None
+    return meta.get("source_key")
+
+
+class SQLiteTable(Sequence):
+    """A catalog table read from SQLite, in insertion order.
+
+    Rows come back as fresh records on every access; iteration streams them
+    in chunks rather than loading the table. The object itself stays the same
+    for the life of the catalog, so per-catalog indexes keyed on it survive.
+    """
+
+    def __init__(self, catalog: "SQLiteCatalog", table: str):
+        self.catalog = catalog
+        self.table = table
+        self._names = _columns(table) if TABLES[table] else ("data",)
+        self._select = f"SELECT {', '.join(self._names)} FROM {table}"
+        self._len = catalog.query(f"SELECT count(*) FROM {table}")[0][0]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        rows = self.catalog.query(f"{self._select} WHERE rowid = ?", (index + 1,))
+        return _decode(self.table, self._names, rows[0])
+
+    def __iter__(self) -> Iterator[Any]:
+        last = 0
+        while True:
+            rows = self.catalog.query(
+                f"{self._select.replace('SELECT ', 'SELECT rowid, ', 1)} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, FETCH_CHUNK),
+            )
+            for row in rows:
+                yield _decode(self.table, self._names, row[1:])
+            if len(rows) < FETCH_CHUNK:
+                return
+            last = rows[-1][0]
+
+    def decode(self, values: Tuple) -> Any:
+        return _decode(self.table, self._names, values)
+
+
+class SQLiteCatalog:
+    """One read-only, memory-mapped connection to a catalog database.
+
+    Streamlit serves sessions from threads, so the connection is opened with
+    check_same_thread off and every statement runs under a lock. Worker
+    processes each open their own connection (forked ones reopen it after
+    the fork); with mmap they share the file's pages through the OS page
+    cache.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._open()
+        self.tables = {name: SQLiteTable(self, name) for name in TABLES}
+
+    def _open(self) -> None:
+        # Also run in forked children: SQLite connections must not be used
+        # across fork(), so each process gets its own over the same mapping.
+        self._conn = sqlite3.connect(
+            f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False,
+        )
+        self._conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self._conn.execute("PRAGMA query_only=ON")
+        self._lock = threading.Lock()
+
+    def query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _course_select(self, alias: str = "c") -> str:
+        return ", ".join(f"{alias}.{name}" for name in self.tables["courses"]._names)
+
+    def plan_courses(self, program_id, year: int, term: int, flag: Optional[str] = None) -> List[Course]:
+        sql = (
+            f"SELECT {self._course_select()} FROM plan p JOIN courses c ON c.rowid = p.course_row "
+            "WHERE p.program_id IS ? AND p.year_code = ? AND p.term_code = ?"
+        )
+        params: Tuple = (program_id, year, term)
+        if flag:
+            sql += " AND instr(c.flags, ?) > 0"
+            params += (f",{flag},",)
+        decode = self.tables["courses"].decode
+        return [decode(row) for row in self.query(sql + " ORDER BY p.rowid", params)]
+
+    def plan_years(self, program_id) -> List[int]:
+        rows = self.query(
+            "SELECT DISTINCT year_code FROM plan WHERE program_id IS ? AND year_code >= 0 ORDER BY year_code",
+            (program_id,),
+        )
+        return [r[0] for r in rows]
+
+    def units_by_term(self, program_id, year: int) -> List[Tuple[int, int, int, bool]]:
+        """(term, units, units without diagnostic courses, has a diagnostic course) per term."""
+        rows = self.query(
+            "SELECT p.term_code, sum(c.units_total), "
+            "sum(CASE WHEN instr(c.flags, ',diagnostic,') > 0 THEN 0 ELSE c.units_total END), "
+            "max(instr(c.flags, ',diagnostic,') > 0) "
+            "FROM plan p JOIN courses c ON c.rowid = p.course_row "
+            "WHERE p.program_id IS ? AND p.year_code = ? GROUP BY p.term_code",
+            (program_id, year),
+        )
+        return [(t, total, kept, bool(diag)) for t, total, kept, diag in rows]
+
+    def units_matrix(self) -> Tuple[List[str], List[Tuple[int, int, int, int]]]:
+        """Program ids in plan order and (program index, year, term, units) sums."""
+        program_ids = [r[0] for r in self.query("SELECT program_id FROM plan GROUP BY program_id ORDER BY min(rowid)")]
+        index = {pid: i for i, pid in enumerate(program_ids)}
+        rows = self.query(
+            "SELECT p.program_id, p.year_code, p.term_code, sum(c.units_total) "
+            "FROM plan p JOIN courses c ON c.rowid = p.course_row "
+            "WHERE p.year_code >= 0 AND p.term_code >= 0 GROUP BY p.program_id, p.year_code, p.term_code"
+        )
+        return program_ids, [(index[pid], y, t, units) for pid, y, t, units in rows]
+
+    def prerequisites(self, course_id: str) -> List[Course]:
+        rows = self.query(
+            f"SELECT r.prerequisite_course_id, {self._course_select()} "
+            "FROM prereqs r JOIN courses c ON c.rowid = r.prereq_row "
+            "WHERE r.course_id = ? AND r.is_course ORDER BY r.rowid",
+            (course_id,),
+        )
+        decode = self.tables["courses"].decode
+        needed, seen = [], set()
+        for pre_id, *values in rows:
+            if pre_id not in seen:
+                seen.add(pre_id)
+                needed.append(decode(tuple(values)))
+        return needed
+
+    def course_by_code(self, code: str) -> Optional[Course]:
+        """The first course whose code_key() is `code`."""
+        rows = self.query(
+            f"SELECT {self._course_select()} FROM courses c WHERE c.code_key = ? ORDER BY c.rowid LIMIT 1", (code,),
+        )
+        return self.tables["courses"].decode(rows[0]) if rows else None
+
+    def plan_entries(self, course_id: str) -> List[PlanEntry]:
+        """The plan rows whose course_key() is `course_id`, in plan order."""
+        plan = self.tables["plan"]
+        rows = self.query(
+            f"SELECT {', '.join(plan._names)} FROM plan WHERE course_key = ? ORDER BY rowid", (course_id,),
+        )
+        return [plan.decode(row) for row in rows]
+
+    def search_titles(self, words: List[str], limit: int) -> List[Course]:
+        """Courses whose title or code has a word starting with each of `words`."""
+        match = " ".join('"{}"*'.format(w.replace('"', '""')) for w in words)
+        rows = self.query(
+            f"SELECT {self._course_select()} FROM course_titles t JOIN courses c ON c.rowid = t.rowid "
+            "WHERE course_titles MATCH ? ORDER BY length(c.course_title), c.rowid LIMIT ?",
+            (match, limit),
+        )
+        decode = self.tables["courses"].decode
+        return [decode(row) for row in rows]
+
+
+_catalogs: Dict[Tuple[str, str], SQLiteCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def open_catalog(path: Path, source_key: str) -> SQLiteCatalog:
+    """The process-wide catalog for a database file built from `source_key`."""
+    key = (str(Path(path).resolve()), source_key)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = SQLiteCatalog(path)
+        return catalog
+
+
+def _reopen_after_fork() -> None:
+    global _catalogs_lock
+    _catalogs_lock = threading.Lock()
+    for catalog in _catalogs.values():
+        # Keep the parent's connection referenced so the child never closes it.
+        catalog._inherited = catalog._conn
+        catalog._open()
+
+
+os.register_at_fork(after_in_child=_reopen_after_fork)
@@ -1,6 +1,15 @@
 import streamlit as st
 import sys
 import re
+import json
+import multiprocessing
+import pickle
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 # Mock Streamlit Session State
 if "awaiting_dept_scope" not in st.session_state:
@@ -15,10 +24,20 @@ if "chat" not in st.session_state:
     st.session_state.chat = []
 
 try:
-    from app import route, data, OFFICIAL_SOURCE
+    from app import route, data, OFFICIAL_SOURCE, fast_path_stats
 except ImportError:
     print("❌ Error: Could not import 'app.py'.")
     sys.exit(1)
+import app
+import data_api
+import nlu_rules
+import prefork
+from college_shards import ShardRouter
+import alias_registry
+from alias_registry import ALIASES
+from lru_memo import LRUMemo
+from data_api import get_cas_dean, _best_code, _build_directory_index, _contact_minutes, _load_sqlite, get_prerequisites, search_course_titles, _split_credit_units, courses_for_plan, courses_with_flag, units_by_program_year, units_matrix, _clean_course_query, memo_stats, find_course_any, find_courses_bulk, fuzzy_best_course_title, fuzzy_top_course_titles
+from rapidfuzz import fuzz, process, utils
 
 
 def run_tests():
@@ -893,6 +912,57 @@ def run_tests():
             "should_contain": ["I'm a bit lost"],
             "expect_source": None,
             "desc": "Treat bare program query as vague (Abbrev)"
+        },
+
+        # ==============================================================================
+        # SECTION 17: REGEX FAST PATH (NO SPACY)
+        # ==============================================================================
+        {
+            "cat": "FastPath",
+            "input": "hello!",
+            "should_contain": ["Hey there! How can I help you today?"],
+            "expect_source": False,
+            "desc": "Bare greeting answered without spaCy"
+        },
+        {
+            "cat": "FastPath",
+            "input": "CC 111",
+            "should_contain": ["I found", "Introduction to Computing"],
+            "should_not_contain": ["I found a few courses"],
+            "expect_source": False,
+            "desc": "Bare course code answered without spaCy"
+        },
+        {
+            "cat": "FastPath",
+            "input": "thanks",
+            "should_contain": ["Got it"],
+            "expect_source": False,
+            "desc": "Acknowledgement answered without spaCy"
+        },
+        {
+            "cat": "FastPath",
+            "input": "where do I pay my tuition?",
+            "should_contain": ["Finance Office", "NWUFinance"],
+            "expect_source": False,
+            "desc": "Payment question referred to Finance"
+        },
+
+        # ==============================================================================
+        # SECTION 18: TYPO CORRECTION
+        # ==============================================================================
+        {
+            "cat": "Typos",
+            "input": "prerequisite of purposive comunication",
+            "should_contain": ["Purposive Communication", "English Review"],
+            "expect_source": True,
+            "desc": "Misspelled title corrected before matching"
+        },
+        {
+            "cat": "Typos",
+            "input": "how many units is microbiolgy",
+            "should_contain": ["Microbiology", "5 units"],
+            "expect_source": True,
+            "desc": "Misspelled one-word title corrected before matching"
         }
 
 
@@ -945,8 +1015,290 @@ def run_tests():
             print(f"   Actual Source: {response_source}")
         print("-" * 60)
 
+    inputs = [t['input'] for t in test_cases]
+    def check(label: str, ok: bool, detail=None) -> None:
+        # The checks below count towards the result like the routed cases.
+        nonlocal passed_count, total_count
+        total_count += 1
+        passed_count += bool(ok)
+        print(f"{label}:", "✅ PASS" if ok else f"❌ FAIL {detail}" if detail else "❌ FAIL")
+
+    check(
+        "Batch NLU matches single-string calls",
+        list(nlu_rules.detect_intents(inputs, batch_size=16)) == [nlu_rules.detect_intent(x) for x in inputs]
+        and list(nlu_rules.extract_entities_batch(inputs, batch_size=16)) == [nlu_rules.extract_entities(x) for x in inputs],
+    )
+
+    # A cache miss builds on the current engine, re-tokenizing only changed labels.
+    base = nlu_rules.NLUEngine.build(data["programs"], data["courses"], data["departments"])
+    extra = {"program_id": "P-TST", "program_name": "Bachelor of Science in Testing", "department_id": "D-CS"}
+    with tempfile.TemporaryDirectory() as tmp:
+        rebuilt = nlu_rules.load_or_build_engine(
+            dict(data, programs=list(data["programs"]) + [extra]), data_api.catalog_files(), Path(tmp) / "nlu.pkl", base=base,
+        )
+    check(
+        "NLU rebuild reuses the unchanged gazetteers",
+        rebuilt.nlp is base.nlp and rebuilt._phrase_docs["COURSETITLE"] is base._phrase_docs["COURSETITLE"]
+        and rebuilt._phrase_docs["PROG"] is not base._phrase_docs["PROG"]
+        and rebuilt.extract_entities("Bachelor of Science in Testing subjects")["program"] == extra["program_name"],
+    )
+
+    # An edit to alias_registry.py invalidates the compiled NLU cache.
+    files = data_api.catalog_files()
+    key = nlu_rules.compiled_cache_key(files)
+    source = alias_registry.__file__
+    with tempfile.TemporaryDirectory() as tmp:
+        edited = Path(tmp) / "alias_registry.py"
+        edited.write_text(Path(source).read_text(encoding="utf-8") + "\n# edited\n", encoding="utf-8")
+        alias_registry.__file__ = str(edited)
+        try:
+            edited_key = nlu_rules.compiled_cache_key(files)
+        finally:
+            alias_registry.__file__ = source
+    check("NLU cache key covers alias_registry.py", edited_key != key == nlu_rules.compiled_cache_key(files))
+
+    # Same top hits with and without the trigram prefilter.
+    titles = {c["course_title"]: c for c in data["courses"] if c.get("course_title")}
+    recall_misses = []
+    for x in inputs:
+        q = _clean_course_query(x) or x
+        full = process.extract(q, titles.keys(), scorer=fuzz.token_set_ratio, limit=30, score_cutoff=65, processor=utils.default_process)
+        best = process.extractOne(x, titles.keys(), scorer=fuzz.token_set_ratio, score_cutoff=80, processor=utils.default_process)
+        got = fuzzy_best_course_title(data["courses"], x, score_cutoff=80)
+        if ([m for m, _, _ in fuzzy_top_course_titles(data["courses"], x, limit=30, score_cutoff=65)] != [m for m, _, _ in full]
+                or (got[0] if got else None) != (best[0] if best else None)):
+            recall_misses.append(x)
+    check("Trigram prefilter keeps full-scan top hits", not recall_misses, recall_misses)
+
+    # The code index must find the same best code as a full fuzz.ratio scan.
+    codes = {c["course_code"]: c for c in data["courses"] if c.get("course_code")}
+    code_misses = []
+    for x in inputs:
+        for q in (x, x.replace(" ", "")):
+            full = process.extractOne(q, codes.keys(), scorer=fuzz.ratio, score_cutoff=65, processor=utils.default_process)
+            got = _best_code(data["courses"], q, 65)
+            if (got[0]["course_code"] if got else None) != (full[0] if full else None):
+                code_misses.append(q)
+    check("Code index keeps full-scan best codes", not code_misses, code_misses)
+
+    typo_cases = {
+        "purposive comunication": ("Purposive Communication", "exact_title"),
+        "prereq of mathematics in the modrn world": ("Mathematics in the Modern World", "high_confidence_fuzzy"),
+    }
+    typo_ok = all(
+        (c or {}).get("course_title") == title and m == match_type
+        for (c, m), (title, match_type) in ((find_course_any(data, q), want) for q, want in typo_cases.items())
+    )
+    check("Typo index corrects misspelled titles", typo_ok)
+
+    memo = LRUMemo(maxsize=2)
+    for key in ("a", "b", "a", "c", "b"):
+        memo.get(key, lambda: key.upper())
+    check("LRU memo evicts least recently used", memo.stats() == {"size": 2, "hits": 1, "misses": 4, "evictions": 2}, memo.stats())
+
+    hits = [(h.kind, h.target, h.alias) for h in ALIASES.find("Is the CS dept. head in the College of Arts and Sciences? Welcome!")]
+    alias_ok = hits == [
+        ("program", "Bachelor of Science in Computer Science", "CS"),
+        ("department", "D-CS", "CS dept."),
+        ("department", "D-CAS", "College of Arts and Sciences"),
+        ("college", "CAS", "College of Arts and Sciences"),
+    ]
+    check("Alias registry finds typed longest matches", alias_ok, hits)
+
+    no_head = [dict(d, department_head="") if d["department_id"] == "D-CS" else d for d in data["departments"]]
+    directory = _build_directory_index(no_head, data["faculty"])
+    directory_ok = (
+        directory.head_of(directory.by_id["D-CS"]) == "PROF. RC"
+        and [r["department_id"] for r in directory.heads][0] == "D-CAS"
+        and directory.containing("NATURAL")["department_id"] == "D-NS"
+        and directory.containing("NOWHERE") is None
+    )
+    check("Directory index joins faculty heads", directory_ok)
+
+    # An evicted directory is rebuilt with the roster load_all() read.
+    roster = data_api._directory(data["departments"]).faculty_by_dept
+    data_api._choice_cache["directory"].clear()
+    rebuilt = data_api._directory(data["departments"])
+    check("Directory rebuild keeps the faculty roster", roster and rebuilt.faculty_by_dept == roster)
+    cs_faculty = data_api.faculty_by_department(data, "D-CS")
+    check(
+        "Faculty grouped by department",
+        cs_faculty and cs_faculty == [f for f in data["faculty"] if f.get("department_id") == "D-CS"]
+        and data_api.faculty_by_department(data, "D-NONE") == [],
+    )
+
+    cs_year2 = courses_for_plan(data["plan"], data["courses"], "P-CS", 2, 1)
+    flags_ok = (
+        courses_for_plan(data["plan"], data["courses"], "P-CS", 2, 1, flag="lab")
+        == [c for c in cs_year2 if "L/L" in c["course_code"] or (c.get("laboratory_hours_per_week") or "0").strip() not in ("", "0")]
+        and [c["course_code"] for c in courses_with_flag(data["courses"], "diagnostic")] == ["IMAT", "IENG"]
+        and all(c["course_code"].startswith("PATHFIT") for c in courses_with_flag(data["courses"], "pathfit"))
+    )
+    check("Course flags filter plan slices", flags_ok)
+
+    parse_ok = (
+        [_contact_minutes(x) for x in ("2 hours 40 minutes", "4 hours", "1 hour 20 minutes", "", "3")] == [160, 240, 80, 0, 180]
+        and [_split_credit_units(x) for x in ("2/1", "3", "", "x")] == [(2, 1), (3, 0), (0, 0), (0, 0)]
+        and all(c["total_units"] == c["lecture_units"] + c["lab_units"] for c in data["courses"])
+    )
+    check("Units and contact hours parsed at load", parse_ok)
+
+    # CS 211 L/L and CS 212 L/L: 2h40 + 4h lab each; MATH 212, LWR, FUT: 4h; PATHFIT 4: 2h40.
+    contact = data_api.contact_minutes_for_term(data["plan"], data["courses"], "P-CS", 2, 1)
+    first = data_api.contact_minutes_for_term(data["plan"], data["courses"], "P-CS", 1, 1, exclude_diagnostic=True)
+    check(
+        "Weekly contact minutes of a plan slice",
+        contact == {"lecture_minutes": 1200, "lab_minutes": 480, "total_minutes": 1680}
+        and first["total_minutes"] == data_api.contact_minutes_for_term(data["plan"], data["courses"], "P-CS", 1, 1)["total_minutes"] - 480
+        and "Weekly contact time: 28 hours (20 hours lecture, 8 hours lab)" in route("units of 2nd year cs 1st sem")[0],
+    )
+
+    course = data["courses"][0]
+    entry = data["plan"][0]
+    records_ok = (
+        course["course_id"] == course.get("course_code") and course.get("missing", "x") == "x"
+        and "missing" not in course and dict(course)["course_title"] == course.course_title
+        and isinstance(entry["year_level"], int) and isinstance(entry["semester"], int)
+    )
+    try:
+        course.course_title = "changed"
+        records_ok = False
+    except AttributeError:
+        pass
+    check("Catalog records behave like read-only dicts", records_ok)
+
+    program_ids, matrix = units_matrix(data["plan"], data["courses"])
+    matrix_ok = all(
+        {str(t): int(matrix[i, y, t]) for t in (1, 2, 3) if matrix[i, y, t]}
+        == units_by_program_year(data["plan"], data["courses"], pid, y)[1]
+        for i, pid in enumerate(program_ids) for y in (1, 2, 3)
+    )
+    check("Units matrix matches per-program unit sums", matrix_ok)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sql = _load_sqlite(Path(tmp) / "catalog.sqlite3")
+        pid = data["plan"][0]["program_id"]
+        sqlite_ok = (
+            list(sql["courses"]) == list(data["courses"]) and sql["plan"][-1] == data["plan"][-1]
+            and all(
+                courses_for_plan(sql["plan"], sql["courses"], pid, y, t) == courses_for_plan(data["plan"], data["courses"], pid, y, t)
+                for y in (1, 2, 3, 4) for t in (1, 2, 3)
+            )
+            and all(
+                get_prerequisites(sql["prereqs"], sql["courses"], c["course_id"]) == get_prerequisites(data["prereqs"], data["courses"], c["course_id"])
+                for c in data["courses"]
+            )
+            and units_by_program_year(sql["plan"], sql["courses"], pid, 1) == units_by_program_year(data["plan"], data["courses"], pid, 1)
+            and search_course_titles(sql["courses"], "programming") == search_course_titles(data["courses"], "programming") != []
+            and all(
+                data_api.find_course_by_code(sql["courses"], c["course_code"].lower()) == data_api.find_course_by_code(data["courses"], c["course_code"].lower())
+                and data_api.get_course_curriculum_entries(sql["plan"], c["course_id"]) == data_api.get_course_curriculum_entries(data["plan"], c["course_id"])
+                for c in data["courses"]
+            )
+            and data_api.find_course_by_code(sql["courses"], "ZZ 999") is None
+        )
+        check("SQLite backend answers like the in-memory catalog", sqlite_ok)
+
+        # A forked worker reopens the catalog connection and shares the engine.
+        results = multiprocessing.get_context("fork").Queue()
+        worker, = prefork.fork_workers(1, lambda: results.put((
+            [c["course_id"] for c in courses_for_plan(sql["plan"], sql["courses"], pid, 1, 1)],
+            list(nlu_rules.detect_intents(inputs[:8], batch_size=4)),
+        )))
+        forked = results.get(timeout=60)
+        worker.join()
+        engine = pickle.loads(pickle.dumps(nlu_rules.get_engine()))
+        forked_ok = (
+            forked == ([c["course_id"] for c in courses_for_plan(data["plan"], data["courses"], pid, 1, 1)], [nlu_rules.detect_intent(x) for x in inputs[:8]])
+            and [engine.detect_intent(x) for x in inputs[:8]] == forked[1]
+        )
+    check("Forked workers share the catalog and NLU engine", forked_ok)
+
+    # A second college on disk is loaded on first mention and dropped when idle.
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        shutil.copytree(data_api.DATADIR, root / "CAS")
+        shutil.copytree(data_api.DATADIR, root / "CEAT")
+        (root / "CEAT" / "departments.json").write_text(json.dumps(
+            [{"department_id": "D-CEAT", "department_name": "CEAT Dean", "department_head": "ENGR. QX", "dean_flag": "Y"}]
+        ))
+        (root / "CEAT" / "programs.json").write_text(json.dumps(
+            [{"program_id": "P-CE", "program_name": "Bachelor of Science in Civil Engineering", "short_name": "BSCE", "department_id": "D-CEAT"}]
+        ))
+        router = ShardRouter(root, idle_seconds=60)
+        routed = [router.college_for(t) for t in ("who is the dean of CEAT?", "BSCE first year units", "BSCS units", "hello")]
+        before = router.loaded()
+        find_course_any(data, "calculus")
+        ceat = router.get("CEAT")
+        app_router = app.shard_router()
+        home_root, app_router.root = app_router.root, root
+        try:
+            reply, _ = route("Who is the dean of CEAT?")
+            # Concurrent messages each answer from their own college's catalog.
+            asks = ["Who is the dean of CEAT?", "Who is the dean of CAS?"] * 16
+            with ThreadPoolExecutor(8) as pool:
+                replies = [r for r, _ in pool.map(route, asks)]
+            isolated = all(("ENGR. QX" in r) == ("CEAT" in q) for q, r in zip(asks, replies))
+        finally:
+            app_router.root = home_root
+            app_router.evict_idle(float("inf"))
+        shards_ok = (
+            routed == ["CEAT", "CEAT", "CAS", None] and before == [] and router.get("CEBU") is None
+            and get_cas_dean(ceat.data["departments"])["department_head"] == "ENGR. QX"
+            and "ENGR. QX" in reply and router.route("BSCE units").college == "CEAT"
+            and router.route("hello").college == "CAS"
+            and router.evict_idle() == [] and router.evict_idle(time.monotonic() + 61) == ["CEAT"]
+            and router.loaded() == ["CAS"] and isolated
+        )
+        # Loading and dropping another college keeps this catalog's memo.
+        hits = memo_stats()["find_course_any"]["hits"]
+        find_course_any(data, "calculus")
+        shards_ok = shards_ok and memo_stats()["find_course_any"]["hits"] == hits + 1
+    check("College shards load on demand and evict when idle", shards_ok)
+
+    # Streaming a large export holds one chunk and one object, not the file.
+    export_mb = 256
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "courses.json"
+        block = ",\n".join(json.dumps({k: v for k, v in dict(c).items() if k != "flags"}) for c in data["courses"])
+        copies = (export_mb << 20) // len(block) + 1
+        with open(export, "w", encoding="utf-8") as f:
+            f.write("[" + block)
+            for _ in range(copies - 1):
+                f.write(",\n" + block)
+            f.write("]")
+        for name in data_api.CATALOG_FILES:
+            if name != export.name:
+                shutil.copy(data_api.DATADIR / name, tmp)
+        script = (
+            "import resource, sys, data_api\n"
+            "from pathlib import Path\n"
+            "before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "data_api._source_key(Path(sys.argv[1]).parent)\n"
+            "rows = sum(1 for _ in data_api._iter_json_clean(sys.argv[1]))\n"
+            "print(rows, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)\n"
+        )
+        out = subprocess.run([sys.executable, "-c", script, str(export)], capture_output=True, text=True, cwd=Path(__file__).parent)
+        rows, grew_kb = map(int, out.stdout.split()[-2:]) if out.returncode == 0 else (0, 0)
+        stream_ok = rows == copies * len(data["courses"]) and grew_kb < 32 << 10
+        # A syntax error in the first object fails without reading on.
+        with open(export, "r+", encoding="utf-8") as f:
+            f.write('[{"a": 1 x}')
+        try:
+            list(data_api._iter_json_objects(export, 1 << 16))
+            stream_ok = False
+        except json.JSONDecodeError as e:
+            stream_ok = stream_ok and e.pos == 9 and len(e.doc) <= 1 << 16
+    check(f"Streaming a {export_mb} MB export stays under 32 MB of extra memory", stream_ok)
+
+    bulk = [(c, m) for c, m, _ in find_courses_bulk(data, inputs)]
+    check("find_courses_bulk matches find_course_any", bulk == [find_course_any(data, x) for x in inputs])
+
     print(f"\nResult: {passed_count}/{total_count} tests passed.")
+    print(f"Route paths: {dict(fast_path_stats())}")
+    print(f"Memo: {memo_stats()}")
+    return passed_count == total_count
 
 
 if __name__ == "__main__":
-    run_tests()
+    sys.exit(0 if run_tests() else 1)
@@ -0,0 +1,34 @@
+from typing import Dict, List, Sequence, Set
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of each word, padded with one space on each side."""
+    grams: Set[str] = set()
+    for word in text.split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from character trigrams to positions in a string list.
+
+    candidates() returns, in list order, every position that shares at least
+    one trigram with the query, so scoring only the candidates yields the same
+    ranking as scoring the whole list for any reasonable fuzzy cutoff.
+    """
+
+    def __init__(self, strings: Sequence[str]):
+        postings: Dict[str, List[int]] = {}
+        for i, s in enumerate(strings):
+            for gram in trigrams(s):
+                postings.setdefault(gram, []).append(i)
+        self._postings = postings
+        self.size = len(strings)
+
+    def candidates(self, query: str) -> List[int]:
+        hits: Set[int] = set()
+        for gram in trigrams(query):
+            hits.update(self._postings.get(gram, ()))
+        return sorted(hits)
@@ -0,0 +1,93 @@
+import sys
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+from rapidfuzz.distance import OSA
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """Every string reachable from `word` by deleting up to `distance` characters."""
+    out = {word}
+    frontier = {word}
+    for _ in range(distance):
+        nxt = set()
+        for w in frontier:
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        nxt -= out
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+class DeletionIndex:
+    """SymSpell-style spelling corrector over a fixed vocabulary.
+
+    Every vocabulary word is stored under each of its deletions up to
+    `max_distance`; a query token is corrected by looking up its own
+    deletions and verifying the few candidates with an edit distance that
+    counts transpositions as one edit. Ties go to the more frequent word,
+    then to the word seen first.
+    """
+
+    def __init__(self, words: Iterable[str], max_distance: int = 2):
+        counts = Counter(w for w in words if w)
+        self.max_distance = max_distance
+        self._rank = {w: (-n, i) for i, (w, n) in enumerate(counts.items())}
+        deletes: Dict[str, List[str]] = {}
+        for word in counts:
+            for d in _deletes(word, max_distance):
+                deletes.setdefault(d, []).append(word)
+        self._deletes = deletes
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._rank
+
+    def __len__(self) -> int:
+        return len(self._rank)
+
+    def lookup(self, token: str, max_distance: Optional[int] = None) -> Optional[str]:
+        """The closest vocabulary word within `max_distance` edits, if any."""
+        if token in self._rank:
+            return token
+        d = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if d <= 0:
+            return None
+        best = None
+        best_key = None
+        for variant in _deletes(token, d):
+            for word in self._deletes.get(variant, ()):
+                dist = OSA.distance(token, word, score_cutoff=d)
+                if dist > d:
+                    continue
+                key = (dist, self._rank[word])
+                if best_key is None or key < best_key:
+                    best, best_key = word, key
+        return best
+
+    def correct(self, text: str, max_distance: Optional[int] = None) -> str:
+        """Correct each whitespace token of an already-normalized string.
+
+        Tokens with digits are left alone, and the allowed distance grows
+        with token length (none up to four characters, then one more per
+        four) so short words and abbreviations are never rewritten.
+        """
+        out = []
+        for tok in text.split():
+            fixed = None
+            if not any(ch.isdigit() for ch in tok):
+                limit = (len(tok) - 1) // 4
+                if max_distance is not None:
+                    limit = min(limit, max_distance)
+                fixed = self.lookup(tok, limit)
+            out.append(fixed or tok)
+        return " ".join(out)
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the deletion table: dict, keys and bucket lists."""
+        total = sys.getsizeof(self._deletes) + sys.getsizeof(self._rank)
+        for key, bucket in self._deletes.items():
+            total += sys.getsizeof(key) + sys.getsizeof(bucket)
+        for word in self._rank:
+            total += sys.getsizeof(word)
+        return total